@@ -1,7 +1,19 @@
+import os
+from contextlib import ExitStack
+
 import click
 from click_option_group import optgroup, RequiredMutuallyExclusiveOptionGroup
 
-from FFFactory.processes.calculate_print import CalculatePrint
+from FFFactory.config import CalculateConfig
+from FFFactory.processes.calculate_print import BatchCalculatePrint, CalculatePrint, CSV_FILE, CSV_HEADER
+from FFFactory.utils.auto_slicer import PrusaSliceCache
+from FFFactory.utils.cache_tools import FileCache
+from FFFactory.utils.csv_tools import CsvWriter, RowWriterBase
+from FFFactory.utils.mesh_tools.mesh_decimation import format_drift
+from FFFactory.utils.results_store import ResultsStore, SqliteWriter, get_config_hash
+from FFFactory.utils.scale_curve import DEFAULT_MAX_ERROR, ScaleCurveEstimator
+from FFFactory.utils.scale_planner import DEFAULT_ANGLE_STEP, ScalePlanner
+from FFFactory.utils.systems_util import ExistsDirType, ExistsFileType
 
 
 @click.group(
@@ -21,33 +33,315 @@ def cli():
 @optgroup.option(
     '-i',
     '--input',
-    type=click.Path(exists=True, dir_okay=True),
+    'input_dir',
+    type=click.Path(exists=True, file_okay=False, dir_okay=True),
     help='Input directory with files to calculate print'
 )
+@optgroup.option(
+    '-b',
+    '--batch',
+    'library_dir',
+    type=click.Path(exists=True, file_okay=False, dir_okay=True),
+    help='Root directory of a model library, every model folder in it is calculated'
+)
+@optgroup.group(
+    'Output',
+    help='The output of results'
+)
 @optgroup.option(
     '-o',
     '--output',
-    type=click.Path(),
+    'output_dir',
+    type=click.Path(exists=True, file_okay=False, dir_okay=True),
     help='Output directory for results'
 )
+@optgroup.option(
+    '--results-db',
+    type=click.Path(dir_okay=False),
+    default=None,
+    help='SQLite results store, rows are kept across runs and exported to the csv at the end'
+)
+@optgroup.option(
+    '--resume',
+    is_flag=True,
+    default=False,
+    help='Skip models and scales already in the results store for this slicer config'
+)
 @optgroup.group(
     'Slicer options',
-    cls=RequiredMutuallyExclusiveOptionGroup,
     help='The slicer options'
 )
 @optgroup.option(
     '-c',
     '--slicer-config',
+    required=True,
     type=click.Path(exists=True, dir_okay=False),
     help='Slicer configuration file'
 )
 @optgroup.option(
     '-s',
     '--scale',
-    flag=True,
+    is_flag=True,
     default=False,
     help='Scale the print of the 10-120cm',
 )
-def calculate_print() -> None:
-    calculator = CalculatePrint(self.input_dir, self.output_dir, self.writer)
+@optgroup.option(
+    '-j',
+    '--jobs',
+    type=click.IntRange(min=1),
+    default=None,
+    help='Number of concurrent jobs, defaults to the number of cores'
+)
+@optgroup.option(
+    '--slice-cache',
+    'slice_cache_dir',
+    type=click.Path(exists=True, file_okay=False, dir_okay=True),
+    default=None,
+    help='Directory of the slice result cache shared between runs'
+)
+@optgroup.option(
+    '--mesh-cache',
+    'mesh_cache_dir',
+    type=click.Path(exists=True, file_okay=False, dir_okay=True),
+    default=None,
+    help='Directory of the repaired and oriented mesh cache shared between runs'
+)
+@optgroup.option(
+    '--part-timeout',
+    type=click.FloatRange(min=0, min_open=True),
+    default=None,
+    help='Seconds to orient one part of a model before it is left as it is'
+)
+@optgroup.option(
+    '--fast-orientation',
+    is_flag=True,
+    default=False,
+    help=(
+        'Orient models with the batched NumPy evaluator instead of Tweak. It tries only the axes and the '
+        'largest facet directions, measures the contour on the outline of the bed facets and may turn the '
+        'model differently around Z, so it can choose another orientation than Tweak'
+    )
+)
+@optgroup.option(
+    '--decimate',
+    is_flag=True,
+    default=False,
+    help='Simplify dense meshes before repair and orientation, for quotes only'
+)
+@optgroup.option(
+    '--rotate-to-fit',
+    is_flag=True,
+    default=False,
+    help='Turn models around Z when a scale does not fit the bed as it is'
+)
+@optgroup.option(
+    '--rotate-step',
+    type=click.IntRange(min=1, max=90),
+    default=DEFAULT_ANGLE_STEP,
+    help='Degrees between the rotations tried by --rotate-to-fit'
+)
+@optgroup.option(
+    '--cut-to-fit',
+    is_flag=True,
+    default=False,
+    help='Cut sizes over the printer into parts, slice them at once and quote their sum'
+)
+@optgroup.option(
+    '-e',
+    '--estimate',
+    is_flag=True,
+    default=False,
+    help='Slice only a few anchor scales and estimate the others from fitted curves'
+)
+@optgroup.option(
+    '--estimate-max-error',
+    type=click.FloatRange(min=0),
+    default=DEFAULT_MAX_ERROR,
+    help='Relative error of a held-out scale above which every scale is sliced'
+)
+@optgroup.option(
+    '--no-verify',
+    is_flag=True,
+    default=False,
+    help='Trust the estimated scales without slicing a held-out scale'
+)
+def calculate_print(
+    input_dir: str | None,
+    library_dir: str | None,
+    output_dir: str | None,
+    results_db: str | None,
+    resume: bool,
+    slicer_config: str,
+    scale: bool,
+    jobs: int | None,
+    slice_cache_dir: str | None,
+    mesh_cache_dir: str | None,
+    part_timeout: float | None,
+    fast_orientation: bool,
+    decimate: bool,
+    rotate_to_fit: bool,
+    rotate_step: int,
+    cut_to_fit: bool,
+    estimate: bool,
+    estimate_max_error: float,
+    no_verify: bool
+) -> None:
+    output = ExistsDirType(output_dir) if output_dir is not None else CalculateConfig.DEFAULT_OUTPUT_DIR
+    config_file = ExistsFileType(slicer_config)
+    slice_cache = None
+    if slice_cache_dir is not None:
+        slice_cache = PrusaSliceCache(FileCache(ExistsDirType(slice_cache_dir)))
+    estimator = None
+    if estimate:
+        estimator = ScaleCurveEstimator(verify=not no_verify, max_error=estimate_max_error)
+    scale_planner = ScalePlanner(rotate=rotate_to_fit, angle_step=rotate_step, cut=cut_to_fit)
+    if resume and results_db is None:
+        raise click.UsageError('--resume needs --results-db')
+    csv_file = os.path.join(output.value, CSV_FILE)
+    config_hash = get_config_hash(
+        config_file.value,
+        estimate=estimate,
+        decimate=decimate,
+        rotate_to_fit=rotate_to_fit,
+        cut_to_fit=cut_to_fit
+    )
+    done = ResultsStore(results_db).get_done(config_hash) if resume and results_db is not None else {}
+    with ExitStack() as stack:
+        writer: RowWriterBase
+        if results_db is not None:
+            writer = stack.enter_context(SqliteWriter(results_db, config_hash, CSV_HEADER[0], CSV_HEADER[1]))
+        else:
+            writer = stack.enter_context(CsvWriter(csv_file, CSV_HEADER))
+        if library_dir is not None:
+            batch = BatchCalculatePrint(
+                ExistsDirType(library_dir),
+                output,
+                writer,
+                jobs,
+                ExistsDirType(slice_cache_dir) if slice_cache_dir is not None else None,
+                estimator,
+                done,
+                ExistsDirType(mesh_cache_dir) if mesh_cache_dir is not None else None,
+                part_timeout,
+                fast_orientation,
+                decimate,
+                scale_planner
+            )
+            failed = batch.calculate(config_file, scale)
+            for result in failed:
+                click.echo(f"{result['input_dir']}: {result['error']}", err=True)
+            for model, drift in batch.drifts.items():
+                click.echo(f'{model}: decimation drift {format_drift(drift)}', err=True)
+        else:
+            calculate = CalculatePrint(
+                ExistsDirType(input_dir),
+                output,
+                writer,
+                jobs or os.cpu_count() or 1,
+                slice_cache,
+                estimator,
+                done.get(os.path.basename(os.path.normpath(input_dir))),  # type: ignore
+                FileCache(ExistsDirType(mesh_cache_dir)) if mesh_cache_dir is not None else None,
+                part_timeout,
+                fast_orientation,
+                decimate,
+                scale_planner
+            )
+            calculate.calculate(config_file, scale)
+            for reason in calculate.preflight_reasons:
+                click.echo(f"Skipped: {reason['message']}", err=True)
+            if calculate.decimation_drift is not None:
+                click.echo(f'Decimation drift: {format_drift(calculate.decimation_drift)}', err=True)
+            if slice_cache is not None:
+                click.echo(f'Slice cache: {slice_cache.stats}', err=True)
+            if calculate.orientation_cache is not None:
+                orientation_cache = calculate.orientation_cache
+                click.echo(
+                    f'Orientation cache: {orientation_cache.stats}, hit rate {orientation_cache.hit_rate:.0%}',
+                    err=True
+                )
+    if results_db is not None:
+        ResultsStore(results_db).export_csv(csv_file, CSV_HEADER, config_hash)
 
+
+@cli.command()
+@click.option(
+    '-d',
+    '--results-db',
+    required=True,
+    type=click.Path(exists=True, dir_okay=False),
+    help='SQLite results store'
+)
+@click.option(
+    '-o',
+    '--output',
+    'output_file',
+    required=True,
+    type=click.Path(dir_okay=False),
+    help='File to export the results to'
+)
+@click.option(
+    '-f',
+    '--format',
+    'output_format',
+    type=click.Choice(['csv', 'jsonl']),
+    default='csv',
+    show_default=True,
+    help='Format of the exported file'
+)
+@click.option(
+    '-c',
+    '--slicer-config',
+    type=click.Path(exists=True, dir_okay=False),
+    default=None,
+    help='Export only the results sliced with this configuration file'
+)
+@click.option(
+    '--estimate',
+    is_flag=True,
+    default=False,
+    help='With -c, the results calculated with --estimate'
+)
+@click.option(
+    '--decimate',
+    is_flag=True,
+    default=False,
+    help='With -c, the results calculated with --decimate'
+)
+@click.option(
+    '--rotate-to-fit',
+    is_flag=True,
+    default=False,
+    help='With -c, the results calculated with --rotate-to-fit'
+)
+@click.option(
+    '--cut-to-fit',
+    is_flag=True,
+    default=False,
+    help='With -c, the results calculated with --cut-to-fit'
+)
+def export_results(
+    results_db: str,
+    output_file: str,
+    output_format: str,
+    slicer_config: str | None,
+    estimate: bool,
+    decimate: bool,
+    rotate_to_fit: bool,
+    cut_to_fit: bool
+) -> None:
+    store = ResultsStore(results_db)
+    config_hash = None
+    if slicer_config is not None:
+        config_hash = get_config_hash(
+            slicer_config,
+            estimate=estimate,
+            decimate=decimate,
+            rotate_to_fit=rotate_to_fit,
+            cut_to_fit=cut_to_fit
+        )
+    if output_format == 'jsonl':
+        count = store.export_jsonl(output_file, config_hash)
+    else:
+        count = store.export_csv(output_file, CSV_HEADER, config_hash)
+    click.echo(f'Exported {count} rows to {output_file}', err=True)
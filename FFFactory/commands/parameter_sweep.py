@@ -0,0 +1,124 @@
+import os
+
+import click
+
+from FFFactory.config import CalculateConfig
+from FFFactory.processes.calculate_print import NotScalerGroup, ScalerGroup, ScannerObjs, get_prusa_slicer
+from FFFactory.processes.parameter_sweep import ParameterSweep, parse_override_value
+from FFFactory.utils.auto_slicer import PrusaSliceCache
+from FFFactory.utils.cache_tools import FileCache
+from FFFactory.utils.csv_tools import CsvWriter
+from FFFactory.utils.systems_util import ExistsDirType, ExistsFileType
+
+
+SWEEP_CSV_FILE = 'parameter_sweep.csv'
+
+
+def parse_params(
+    ctx: click.Context,
+    param: click.Parameter,
+    values: tuple[str, ...]
+) -> dict[str, list]:
+    overrides: dict[str, list] = {}
+    for value in values:
+        key, separator, options = value.partition('=')
+        if not separator or not options:
+            raise click.BadParameter('Expected KEY=VALUE[,VALUE...], got %s' % value)
+        overrides.setdefault(key.strip(), []).extend(
+            parse_override_value(option.strip()) for option in options.split(',')
+        )
+    return overrides
+
+
+@click.group(
+    name='parameter_sweep',
+    help='Commands to price one model across slicer options'
+)
+def cli():
+    pass
+
+
+@cli.command()
+@click.option(
+    '-i',
+    '--input',
+    'input_dir',
+    required=True,
+    type=click.Path(exists=True, file_okay=False, dir_okay=True),
+    help='Input directory with the model to sweep'
+)
+@click.option(
+    '-o',
+    '--output',
+    'output_dir',
+    type=click.Path(exists=True, file_okay=False, dir_okay=True),
+    default=None,
+    help='Output directory for results'
+)
+@click.option(
+    '-c',
+    '--slicer-config',
+    required=True,
+    type=click.Path(exists=True, dir_okay=False),
+    help='Slicer configuration file'
+)
+@click.option(
+    '-p',
+    '--param',
+    'overrides',
+    multiple=True,
+    required=True,
+    callback=parse_params,
+    help='Option to sweep as group.option=value1,value2, e.g. infill_options.fill_density=0.15,0.3'
+)
+@click.option(
+    '-s',
+    '--scale',
+    is_flag=True,
+    default=False,
+    help='Scale the print of the 10-120cm',
+)
+@click.option(
+    '-j',
+    '--jobs',
+    type=click.IntRange(min=1),
+    default=None,
+    help='Number of concurrent jobs, defaults to the number of cores'
+)
+@click.option(
+    '--slice-cache',
+    'slice_cache_dir',
+    type=click.Path(exists=True, file_okay=False, dir_okay=True),
+    default=None,
+    help='Directory of the slice result cache shared between runs'
+)
+def sweep(
+    input_dir: str,
+    output_dir: str | None,
+    slicer_config: str,
+    overrides: dict[str, list],
+    scale: bool,
+    jobs: int | None,
+    slice_cache_dir: str | None
+) -> None:
+    output = ExistsDirType(output_dir) if output_dir is not None else CalculateConfig.DEFAULT_OUTPUT_DIR
+    config_file = ExistsFileType(slicer_config)
+    jobs = jobs or os.cpu_count() or 1
+    slice_cache = None
+    if slice_cache_dir is not None:
+        slice_cache = PrusaSliceCache(FileCache(ExistsDirType(slice_cache_dir)))
+    model = ScannerObjs(ExistsDirType(input_dir)).scan_folder()
+    scaler_group_cls = ScalerGroup if scale else NotScalerGroup
+    try:
+        parameter_sweep = ParameterSweep(
+            ExistsDirType(input_dir),
+            config_file,
+            scaler_group_cls(model, get_prusa_slicer(config_file)),
+            overrides,
+            jobs,
+            slice_cache
+        )
+    except ValueError as e:
+        raise click.BadParameter(str(e), param_hint='--param')
+    with CsvWriter(os.path.join(output.value, SWEEP_CSV_FILE), parameter_sweep.get_fieldnames()) as writer:
+        parameter_sweep.sweep(writer)
@@ -0,0 +1,78 @@
+import asyncio
+
+import click
+
+from FFFactory.config import CalculateConfig
+from FFFactory.processes.quote_daemon import DEFAULT_MAX_QUEUE, DEFAULT_SOCKET_PATH, QuoteDaemon
+
+
+@click.group(
+    name='quote_daemon',
+    help='Resident service answering quote and render jobs over a Unix socket'
+)
+def cli():
+    pass
+
+
+@cli.command()
+@click.option(
+    '--socket',
+    'socket_path',
+    type=click.Path(dir_okay=False),
+    default=DEFAULT_SOCKET_PATH,
+    show_default=True,
+    help='Path of the Unix domain socket to listen on'
+)
+@click.option(
+    '-o',
+    '--output',
+    'output_dir',
+    type=click.Path(exists=True, file_okay=False, dir_okay=True),
+    default=None,
+    help='Output directory for results'
+)
+@click.option(
+    '-j',
+    '--jobs',
+    type=click.IntRange(min=1),
+    default=None,
+    help='Number of worker processes, defaults to the number of cores'
+)
+@click.option(
+    '--max-queue',
+    type=click.IntRange(min=1),
+    default=DEFAULT_MAX_QUEUE,
+    show_default=True,
+    help='Number of pending jobs before clients are made to wait'
+)
+@click.option(
+    '--slice-cache',
+    'slice_cache_dir',
+    type=click.Path(exists=True, file_okay=False, dir_okay=True),
+    default=None,
+    help='Directory of the slice result cache shared between runs'
+)
+@click.option(
+    '--mesh-cache',
+    'mesh_cache_dir',
+    type=click.Path(exists=True, file_okay=False, dir_okay=True),
+    default=None,
+    help='Directory of the repaired and oriented mesh cache shared between runs'
+)
+def serve(
+    socket_path: str,
+    output_dir: str | None,
+    jobs: int | None,
+    max_queue: int,
+    slice_cache_dir: str | None,
+    mesh_cache_dir: str | None
+) -> None:
+    daemon = QuoteDaemon(
+        output_dir if output_dir is not None else CalculateConfig.DEFAULT_OUTPUT_DIR.value,
+        socket_path,
+        jobs,
+        max_queue,
+        slice_cache_dir,
+        mesh_cache_dir
+    )
+    asyncio.run(daemon.serve())
@@ -1,7 +1,7 @@
 import os
 from dotenv import load_dotenv
 
-from FFFactory.utils.systems_util import ExistsDirType
+from FFFactory.utils.systems_util import ExistsDirType, ExistsFileType
 
 load_dotenv()
 
@@ -12,6 +12,7 @@ class RenderConfig():
 
 class CalculateConfig():
     DEFAULT_OUTPUT_DIR: ExistsDirType = ExistsDirType(os.getenv('DEFAULT_OUTPUT_DIR'))
+    SLICER_PATH: ExistsFileType = ExistsFileType(os.getenv('SLICER_PATH'))
 
 
 __all__ = [
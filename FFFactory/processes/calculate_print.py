@@ -1,22 +1,50 @@
 
 
 from abc import ABC, abstractmethod
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
 from decimal import Decimal
 from functools import reduce
-import re
+from itertools import islice, repeat
 import shutil
 import os
+import threading
 from tempfile import TemporaryDirectory
-from typing import Generator, Optional
+from typing import Generator, Optional, TypedDict
 
-from FFFactory.config import RenderConfig
+import numpy as np
+
+from FFFactory.config import CalculateConfig, RenderConfig
 from FFFactory.utils.auto_render import BlenderConfigImporter
 from FFFactory.utils.auto_render.blender.blender_tools import RenderTemplate, get_render_templates
-from FFFactory.utils.auto_slicer import PrusaSlicer, PrusaOutputFilenameFormatFdm as OutPutFdm
-from FFFactory.utils.csv_tools import CsvWriter
-from FFFactory.utils.mesh_tools import MeshTweaker, MeshRepairer
+from FFFactory.utils.auto_slicer import (
+    DctGcodeStats,
+    PrusaSlicer,
+    PrusaSliceCache,
+    PrusaOutputFilenameFormatFdm as OutPutFdm,
+)
+from FFFactory.utils.auto_slicer.prusa_slicer.prusa_gcode import sum_gcode_stats
+from FFFactory.utils.auto_slicer.slicer_types import UnsignedNOptionType
+from FFFactory.utils.cache_tools import FileCache
+from FFFactory.utils.csv_tools import MemoryWriter, RowWriterBase
+from FFFactory.utils.mesh_tools import MeshDecimator, MeshFastTweaker, MeshTweaker, MeshRepairer
+from FFFactory.utils.mesh_tools.fingerprint import get_file_fingerprint
+from FFFactory.utils.mesh_tools.indexed_mesh import IndexedMesh
+from FFFactory.utils.mesh_tools.mesh_cut import cut_mesh
+from FFFactory.utils.mesh_tools.mesh_decimation import DctDecimationDrift
+from FFFactory.utils.mesh_tools.mesh_io import load_meshes, save_meshes
 from FFFactory.utils.mesh_tools.mesh_types import MeshProcessorBase
-from FFFactory.utils.systems_util import ExistsDirType, ExistsFileType
+from FFFactory.utils.mesh_tools.orientation_cache import OrientationCache
+from FFFactory.utils.mesh_tools.preflight import (
+    DctPreflightReason,
+    PreflightError,
+    check_file,
+    get_size_reasons,
+    raise_for_reasons,
+)
+from FFFactory.utils.results_store import get_scale_key
+from FFFactory.utils.scale_curve import ScaleCurveEstimator
+from FFFactory.utils.scale_planner import DctPlannedSize, ScalePlanner
+from FFFactory.utils.systems_util import ExistsDirType, ExistsFileType, get_threads_per_job
 
 
 OBJS = 'objs'
@@ -46,7 +74,14 @@ SCALE_CM = [
 
 CSV_FILE = 'calulate_print.csv'
 
-CSV_HEADER = ['Model', 'Scale Z [mm]', 'Print Time [sec]', 'Total Weight [g]', 'Price']
+CSV_HEADER = ['Model', 'Scale Z [mm]', 'Print Time [sec]', 'Total Weight [g]', 'Price', 'Confidence', 'Parts']
+
+PART_FILE = 'part.stl'
+
+# Sliced sizes are exact, estimated ones are high when a held-out size confirmed the curves
+CONFIDENCE_EXACT = 'exact'
+CONFIDENCE_HIGH = 'high'
+CONFIDENCE_LOW = 'low'
 
 
 class ScannerFolderBase(ABC):
@@ -78,6 +113,10 @@ class ScannerObjs(ScannerFolderBase):
                 return ExistsFileType(file_path)
         return None
 
+    def get_fingerprint(self, mesh_cache: Optional[FileCache] = None) -> str:
+        """Fingerprint of the model geometry, equal for copies in another format or facet order."""
+        return get_file_fingerprint(self.scan_folder().value, mesh_cache)
+
 
 class ScannerBlend(ScannerFolderBase):
 
@@ -91,9 +130,29 @@ class ScannerBlend(ScannerFolderBase):
 
 
 class ScalerGroupBase(ABC):
-    def __init__(self, model: ExistsFileType, prusa_slicer: PrusaSlicer):
+    def __init__(
+        self,
+        model: ExistsFileType,
+        prusa_slicer: PrusaSlicer,
+        mesh_cache: Optional[FileCache] = None,
+        tweak_workers: int = 1,
+        part_timeout: Optional[float] = None,
+        fast_orientation: bool = False,
+        orientation_cache: Optional[OrientationCache] = None,
+        decimate: bool = False,
+        scale_planner: Optional[ScalePlanner] = None
+    ):
         self._prusa_slicer = prusa_slicer
         self._model = model
+        self._mesh_cache = mesh_cache
+        self._tweak_workers = tweak_workers
+        self._part_timeout = part_timeout
+        self._fast_orientation = fast_orientation
+        self._orientation_cache = orientation_cache
+        self._decimate = decimate
+        self._scale_planner = scale_planner or ScalePlanner()
+        self._plan: list[DctPlannedSize] = []
+        self._decimation_drift: Optional[DctDecimationDrift] = None
 
     @property
     def prusa_slicer(self) -> PrusaSlicer:
@@ -103,20 +162,80 @@ class ScalerGroupBase(ABC):
     def model(self) -> str:
         return self._model.value
 
+    @property
+    def mesh_cache(self) -> Optional[FileCache]:
+        return self._mesh_cache
+
+    @property
+    def tweak_workers(self) -> int:
+        return self._tweak_workers
+
+    @property
+    def part_timeout(self) -> Optional[float]:
+        return self._part_timeout
+
+    @property
+    def fast_orientation(self) -> bool:
+        return self._fast_orientation
+
+    @property
+    def orientation_cache(self) -> Optional[OrientationCache]:
+        return self._orientation_cache
+
+    @property
+    def decimate(self) -> bool:
+        return self._decimate
+
+    @property
+    def scale_planner(self) -> ScalePlanner:
+        return self._scale_planner
+
+    @property
+    def plan(self) -> list[DctPlannedSize]:
+        return self._plan
+
+    @property
+    def decimation_drift(self) -> Optional[DctDecimationDrift]:
+        """Drift of the decimated mesh, None without ``decimate`` or for a mesh taken from a cache."""
+        return self._decimation_drift
+
+    def _plan_sizes(self, heights: list[float]) -> Generator[Optional[tuple[Decimal, Decimal, Decimal]], None, None]:
+        info_model = self.prusa_slicer.get_info(self.model)[0]
+        size = (info_model['size_x'], info_model['size_y'], info_model['size_z'])
+        self._plan = self.scale_planner.plan(size, heights)
+        if self.scale_planner.rotate and not all(planned['fits'] and planned['parts'] == 1 for planned in self._plan):
+            # The vertices are read only for a model that does not fit as it is,
+            # cut sizes are planned again so turning is tried before cutting
+            points_xy = IndexedMesh.concatenate(load_meshes(self.model)).vertices[:, :2]
+            self._plan = self.scale_planner.plan(size, heights, points_xy)
+        for planned in self._plan:
+            if planned['fits']:
+                yield planned['size_x'], planned['size_y'], planned['size_z']
+
     def _fix_mesh(self) -> None:
-        mesh_operations: list[type[MeshProcessorBase]] = [
-            MeshTweaker
-        ]
+        # Decorators run before the processor: decimate first, then repair, then orient
+        decorators: list[type[MeshProcessorBase]] = []
+        if self.decimate:
+            decorators.append(MeshDecimator)
         info_about_model = self.prusa_slicer.get_info(self.model)
-        if info_about_model[0]['manifold'] is False:
-            mesh_operations.append(MeshRepairer)
-        mesh_operations.reverse()
+        # Merged vertices may leave pinched edges behind, the repair is cheap when there are none
+        if self.decimate or info_about_model[0]['manifold'] is False:
+            decorators.append(MeshRepairer)
 
-        path_to_fixed_model = mesh_operations[0](
+        tweaker_type = MeshFastTweaker if self.fast_orientation else MeshTweaker
+        tweaker = tweaker_type(
             self._model,
-            *info_about_model[1:]
-        ).save_processed_mesh(
-            ExistsDirType(os.path.basename(self.model))
+            *decorators,
+            mesh_cache=self.mesh_cache,
+            max_workers=self.tweak_workers,
+            part_timeout=self.part_timeout,
+            orientation_cache=self.orientation_cache
+        )
+        path_to_fixed_model = tweaker.save_processed_mesh(
+            ExistsDirType(os.path.dirname(self.model))
+        )
+        self._decimation_drift = next(
+            (stage.drift for stage in tweaker.stages if isinstance(stage, MeshDecimator)), None
         )
         self._model = ExistsFileType(path_to_fixed_model)
 
@@ -132,27 +251,13 @@ class ScalerGroupBase(ABC):
 class ScalerGroup(ScalerGroupBase):
 
     def _scale(self) -> Generator[Optional[tuple[Decimal, Decimal, Decimal]], None, None]:
-        info_model = self.prusa_slicer.get_info(self.model)[0]
-        for scale_z_cm in SCALE_CM:
-            size_z_mm = info_model['size_z']
-            factor_mm = (scale_z_cm * 10) / size_z_mm
-            yield (
-                Decimal(info_model['size_x'] * factor_mm),
-                Decimal(info_model['size_y'] * factor_mm),
-                Decimal(size_z_mm * factor_mm)
-            )
+        return self._plan_sizes([scale_z_cm * 10 for scale_z_cm in SCALE_CM])
 
 
 class NotScalerGroup(ScalerGroupBase):
 
     def _scale(self) -> Generator[Optional[tuple[Decimal, Decimal, Decimal]], None, None]:
-        info_model = self.prusa_slicer.get_info(self.model)[0]
-        for _ in range(1):
-            yield (
-                Decimal(info_model['size_x']),
-                Decimal(info_model['size_y']),
-                Decimal(info_model['size_z'])
-            )
+        return self._plan_sizes([self.prusa_slicer.get_info(self.model)[0]['size_z']])
 
 
 class ScannerRenderConfig(ScannerFolderBase):
@@ -166,23 +271,33 @@ class ScannerRenderConfig(ScannerFolderBase):
         return None
 
 
-def print_time_to_minutes(print_time: str) -> int:
-    result_1 = re.findall(r'^(\d*)h(\d*)m$', print_time)
-    result_2 = re.findall(r'^(\d*)m$', print_time)
-    result_3 = re.findall(r'^(\d*)d(\d*)h(\d*)m$', print_time)
-    if result_1:
-        h = result_1[0][0]
-        m = result_1[0][1]
-        return int(h) * 60 + int(m)
-    elif result_2:
-        m = result_2[0]
-        return int(m)
-    elif result_3:
-        d = result_3[0][0]
-        h = result_3[0][1]
-        m = result_3[0][2]
-        return int(d) * 24 * 60 + int(h) * 60 + int(m)
-    return 0
+def get_prusa_slicer(
+    config_file: ExistsFileType,
+    jobs: int = 1,
+    slice_cache: Optional[PrusaSliceCache] = None,
+    threads: Optional[int] = None
+) -> PrusaSlicer:
+    prusa_slicer = PrusaSlicer(CalculateConfig.SLICER_PATH.value, config_file.value)
+    prusa_slicer.output_file_format = f'{OutPutFdm.INPUT_FILENAME_BASE}'
+    prusa_slicer.config.sliced_options['other_options'].threads = UnsignedNOptionType(
+        threads or get_threads_per_job(jobs)
+    )
+    prusa_slicer.slice_cache = slice_cache
+    return prusa_slicer
+
+
+def get_scales_count(scale: bool) -> int:
+    return len(SCALE_CM) if scale else 1
+
+
+def get_price(print_time_sec: int, total_weight: float) -> Decimal:
+    return Decimal(
+        4.5 * (
+            total_weight / 100.0 * 8.0 + (
+                print_time_sec / 3600 * 0.75
+            )
+        )
+    )
 
 
 class CalculatePrint:
@@ -190,11 +305,40 @@ class CalculatePrint:
         self,
         input_dir: ExistsDirType,
         output_dir: ExistsDirType,
-        writer: CsvWriter
+        writer: RowWriterBase,
+        jobs: int = 1,
+        slice_cache: Optional[PrusaSliceCache] = None,
+        estimator: Optional[ScaleCurveEstimator] = None,
+        done_scales: Optional[set[float]] = None,
+        mesh_cache: Optional[FileCache] = None,
+        part_timeout: Optional[float] = None,
+        fast_orientation: bool = False,
+        decimate: bool = False,
+        scale_planner: Optional[ScalePlanner] = None,
+        threads: Optional[int] = None
     ):
         self.__input_dir = input_dir
         self.__output_dir = output_dir
         self.__writter = writer
+        self.__jobs = max(1, jobs)
+        self.__slice_cache = slice_cache
+        self.__estimator = estimator
+        self.__done_scales = done_scales or set()
+        self.__mesh_cache = mesh_cache
+        self.__part_timeout = part_timeout
+        self.__fast_orientation = fast_orientation
+        self.__decimate = decimate
+        self.__scale_planner = scale_planner
+        self.__threads = threads
+        # Sizes and the parts of cut sizes together never run more than ``jobs`` slicers
+        self.__slicer_slots = threading.BoundedSemaphore(self.__jobs)
+        self.__preflight_reasons: list[DctPreflightReason] = []
+        self.__planned: dict[float, DctPlannedSize] = {}
+        self.__part_counts: dict[float, int] = {}
+        self.__decimation_drift: Optional[DctDecimationDrift] = None
+        # Orientations outlive the oriented meshes, a model re-quoted after its
+        # mesh was evicted or repaired differently is only rotated
+        self.__orientation_cache = OrientationCache(mesh_cache) if mesh_cache is not None else None
 
     @property
     def input_dir(self) -> ExistsDirType:
@@ -205,43 +349,531 @@ class CalculatePrint:
         return self.__output_dir
 
     @property
-    def writter(self) -> CsvWriter:
+    def writter(self) -> RowWriterBase:
         return self.__writter
 
+    @property
+    def jobs(self) -> int:
+        return self.__jobs
+
+    @property
+    def slice_cache(self) -> Optional[PrusaSliceCache]:
+        return self.__slice_cache
+
+    @property
+    def estimator(self) -> Optional[ScaleCurveEstimator]:
+        return self.__estimator
+
+    @property
+    def done_scales(self) -> set[float]:
+        return self.__done_scales
+
+    @property
+    def mesh_cache(self) -> Optional[FileCache]:
+        return self.__mesh_cache
+
+    @property
+    def part_timeout(self) -> Optional[float]:
+        return self.__part_timeout
+
+    @property
+    def fast_orientation(self) -> bool:
+        return self.__fast_orientation
+
+    @property
+    def decimate(self) -> bool:
+        return self.__decimate
+
+    @property
+    def orientation_cache(self) -> Optional[OrientationCache]:
+        return self.__orientation_cache
+
+    @property
+    def scale_planner(self) -> Optional[ScalePlanner]:
+        return self.__scale_planner
+
+    @property
+    def threads(self) -> Optional[int]:
+        """Threads of every slicer, by default the cores are shared among the ``jobs`` slicers."""
+        return self.__threads
+
+    @property
+    def preflight_reasons(self) -> list[DctPreflightReason]:
+        return self.__preflight_reasons
+
+    @property
+    def decimation_drift(self) -> Optional[DctDecimationDrift]:
+        """Volume and bounding box drift of the decimated quote or preview mesh."""
+        return self.__decimation_drift
+
     def render(self):
-        model = ScannerRenderConfig(self.input_dir).scan_folder()
+        render_config = ScannerRenderConfig(self.input_dir).scan_folder()
+        lst_model_configs = BlenderConfigImporter(render_config).import_config()
         lst_render_templates = get_render_templates(
             RenderConfig.TEMPLATES_DIR
         )
-        for render_template in lst_render_templates:
-            render_template.render_image(model)
+        for model_config in lst_model_configs:
+            for render_template in lst_render_templates:
+                if os.path.splitext(render_template.template_name)[0] == model_config['template_name']:
+                    render_template.render_image(model_config)
+                    self.__decimation_drift = render_template.preview_drift or self.__decimation_drift
+
+    def _get_prusa_slicer(self, config_file: ExistsFileType) -> PrusaSlicer:
+        return get_prusa_slicer(config_file, self.jobs, self.slice_cache, self.threads)
+
+    def _export_gcode(self, prusa_slicer: PrusaSlicer, input_file: str, output_dir: str) -> DctGcodeStats:
+        with self.__slicer_slots:
+            return prusa_slicer.export_gcode(input_file, output_dir)['gcode_stats']
+
+    def _slice_size(
+        self,
+        config_file: ExistsFileType,
+        model: ExistsFileType,
+        size: tuple[Decimal, Decimal, Decimal],
+        output_dir: str
+    ) -> DctGcodeStats:
+        # Every job owns its slicer config: the actions, transform and files
+        # options clear themselves once serialized, so they cannot be shared.
+        size_x, size_y, size_z = size
+        prusa_slicer = self._get_prusa_slicer(config_file)
+        planned = self.__planned.get(get_scale_key(size_z))
+        if planned is not None and planned['parts'] > 1:
+            return self._slice_parts(config_file, model, planned, output_dir)
+        if planned is not None and planned['rotation']:
+            # Rotations come before scaling, the size is the footprint of the turned model
+            prusa_slicer.set_rotate(planned['rotation'])
+        prusa_slicer.set_scale_to_fit(size_x, size_y, size_z)
+        return self._export_gcode(prusa_slicer, model.value, output_dir)
+
+    def _slice_part(self, config_file: ExistsFileType, part_file: str, output_dir: str) -> DctGcodeStats:
+        prusa_slicer = self._get_prusa_slicer(config_file)
+        # The cuts are left open, the slicer repair fills them
+        prusa_slicer.set_repair()
+        return self._export_gcode(prusa_slicer, part_file, output_dir)
+
+    def _slice_parts(
+        self,
+        config_file: ExistsFileType,
+        model: ExistsFileType,
+        planned: DctPlannedSize,
+        output_dir: str
+    ) -> DctGcodeStats:
+        """Scales the model, cuts it into parts fitting the printer and slices them at once."""
+        mesh = IndexedMesh.concatenate(load_meshes(model.value))
+        min_xyz, max_xyz = mesh.get_bounds()
+        factor = float(planned['size_z']) / (max_xyz[2] - min_xyz[2])
+        parts = cut_mesh(mesh.transform(np.identity(3) * factor), planned['cuts'])
+        # Boxes of the grid without any surface are dropped
+        self.__part_counts[get_scale_key(planned['size_z'])] = len(parts)
+        part_files, part_dirs = [], []
+        for i, part in enumerate(parts):
+            part_dir = os.path.join(output_dir, str(i))
+            os.makedirs(part_dir)
+            part_files.append(save_meshes([part], os.path.join(part_dir, PART_FILE)))
+            part_dirs.append(part_dir)
+        # The quote is ready after the slowest part instead of after all of them in a row,
+        # the slicer slots keep the parts of every size within ``jobs`` slicers
+        with ThreadPoolExecutor(max_workers=max(1, min(len(parts), self.jobs))) as executor:
+            return sum_gcode_stats(list(executor.map(self._slice_part, repeat(config_file), part_files, part_dirs)))
+
+    def _slice_sizes(
+        self,
+        config_file: ExistsFileType,
+        model: ExistsFileType,
+        sizes: list[tuple[Decimal, Decimal, Decimal]]
+    ) -> list[DctGcodeStats]:
+        with TemporaryDirectory() as temp_dir, ThreadPoolExecutor(max_workers=self.jobs) as executor:
+            output_dirs = []
+            for i in range(len(sizes)):
+                output_dir = os.path.join(temp_dir, str(i))
+                os.makedirs(output_dir)
+                output_dirs.append(output_dir)
+            # executor.map keeps the order of sizes whatever job finishes first
+            return list(executor.map(
+                self._slice_size,
+                repeat(config_file),
+                repeat(model),
+                sizes,
+                output_dirs
+            ))
+
+    def _estimate_sizes(
+        self,
+        config_file: ExistsFileType,
+        model: ExistsFileType,
+        sizes: list[tuple[Decimal, Decimal, Decimal]],
+        estimator: ScaleCurveEstimator
+    ) -> list[tuple[int, float, str]]:
+        anchor_indexes = estimator.get_anchor_indexes(len(sizes))
+        verify_index = estimator.get_verify_index(len(sizes), anchor_indexes)
+        slice_indexes = anchor_indexes + ([verify_index] if verify_index is not None else [])
+        sliced = dict(zip(
+            slice_indexes,
+            self._slice_sizes(config_file, model, [sizes[i] for i in slice_indexes])
+        ))
+
+        scales = [float(size[2]) for size in sizes]
+        print_times, weights = estimator.estimate(
+            [scales[i] for i in anchor_indexes],
+            [sliced[i]['print_time_sec'] for i in anchor_indexes],
+            [sliced[i]['filament_used_g'] for i in anchor_indexes],
+            scales
+        )
+        confidence = CONFIDENCE_LOW
+        if verify_index is not None:
+            error = estimator.get_error(
+                sliced[verify_index]['print_time_sec'],
+                sliced[verify_index]['filament_used_g'],
+                print_times[verify_index],
+                weights[verify_index]
+            )
+            if error > estimator.max_error:
+                remaining = [i for i in range(len(sizes)) if i not in sliced]
+                sliced.update(zip(
+                    remaining,
+                    self._slice_sizes(config_file, model, [sizes[i] for i in remaining])
+                ))
+            else:
+                confidence = CONFIDENCE_HIGH
+
+        result: list[tuple[int, float, str]] = []
+        for i in range(len(sizes)):
+            if i in sliced:
+                result.append((sliced[i]['print_time_sec'], sliced[i]['filament_used_g'], CONFIDENCE_EXACT))
+            else:
+                result.append((int(round(print_times[i])), float(weights[i]), confidence))
+        return result
+
+    def _get_row(
+        self,
+        size_z: Decimal,
+        print_time_sec: int,
+        total_weight: float,
+        confidence: str,
+        parts: int = 1
+    ) -> dict:
+        return {
+            CSV_HEADER[0]: os.path.basename(self.input_dir.value),
+            CSV_HEADER[1]: size_z,
+            CSV_HEADER[2]: print_time_sec,
+            CSV_HEADER[3]: Decimal(str(round(total_weight, 2))),
+            CSV_HEADER[4]: get_price(print_time_sec, total_weight),
+            CSV_HEADER[5]: confidence,
+            CSV_HEADER[6]: parts,
+        }
 
     def slice(self, config_file: ExistsFileType, scaler_group: ScalerGroupBase):
+        sizes = [size for size in scaler_group.scale() if get_scale_key(size[2]) not in self.done_scales]
+        # scale() repairs and orients the model, slice the fixed one
+        model = ExistsFileType(scaler_group.model)
+        # Sizes over the bed would only fail inside the slicer, they were never yielded
+        skipped = [planned for planned in scaler_group.plan if not planned['fits']]
+        reasons = get_size_reasons(
+            [(planned['size_x'], planned['size_y'], planned['size_z']) for planned in skipped],
+            len(skipped) == len(scaler_group.plan)
+        )
+        self.__preflight_reasons.extend(reasons)
+        raise_for_reasons(reasons)
+        self.__planned = {get_scale_key(planned['size_z']): planned for planned in scaler_group.plan}
+        if not sizes:
+            return
+        if self.estimator is not None and self.estimator.can_estimate(len(sizes)):
+            results = self._estimate_sizes(config_file, model, sizes, self.estimator)
+        else:
+            results = [
+                (gcode_stats['print_time_sec'], gcode_stats['filament_used_g'], CONFIDENCE_EXACT)
+                for gcode_stats in self._slice_sizes(config_file, model, sizes)
+            ]
+        for size, (print_time_sec, total_weight, confidence) in zip(sizes, results):
+            planned = self.__planned.get(get_scale_key(size[2]))
+            parts = self.__part_counts.get(get_scale_key(size[2]), planned['parts'] if planned is not None else 1)
+            self.writter.writerow(self._get_row(size[2], print_time_sec, total_weight, confidence, parts))
+
+    def calculate(self, config_file: ExistsFileType, scale: bool) -> None:
+        if len(self.done_scales) >= get_scales_count(scale):
+            return
         model = ScannerObjs(self.input_dir).scan_folder()
-        prusa_slicer = PrusaSlicer(config_file.value)
-        prusa_slicer.output_file_format = f'{OutPutFdm.INPUT_FILENAME_BASE}___T{OutPutFdm.PRINT_TIME}__W{OutPutFdm.TOTAL_WEIGHT}'
-        with TemporaryDirectory() as temp_dir:
-            for size_x, size_y, size_z in scaler_group.scale():
-                prusa_slicer.set_scale_to_fit(size_x, size_y, size_z)
-                info_about_export = prusa_slicer.export_gcode(model.value, temp_dir)
-                print_time = re.findall(r'__T(.*)__W', info_about_export['output_file_name'])[0]
-                total_weight = re.findall(r'__W(.*)', info_about_export['output_file_name'])[0]
-                self.writter.writerow({
-                    CSV_HEADER[0]: os.path.basename(self.input_dir.value),
-                    CSV_HEADER[1]: size_z,
-                    CSV_HEADER[2]: print_time_to_minutes(print_time),
-                    CSV_HEADER[3]: Decimal(total_weight),
-                    CSV_HEADER[4]: Decimal(
-                        4.5 * (
-                            total_weight / 100.0 * 8.0 + (
-                                print_time_to_minutes(print_time) / 60 * 0.75
-                            )
-                        )
-                    )
-                })
+        reasons = check_file(model.value)
+        self.__preflight_reasons.extend(reasons)
+        raise_for_reasons(reasons)
+        scaler_group_type = ScalerGroup if scale else NotScalerGroup
+        scaler_group = scaler_group_type(
+            model,
+            self._get_prusa_slicer(config_file),
+            self.mesh_cache,
+            self.jobs,
+            self.part_timeout,
+            self.fast_orientation,
+            self.orientation_cache,
+            self.decimate,
+            self.scale_planner
+        )
+        self.slice(config_file, scaler_group)
+        self.__decimation_drift = scaler_group.decimation_drift
 
     def move(self):
         dir_name = os.path.dirname(self.input_dir)
         path_to = os.path.join(self.output_dir, dir_name)
         os.makedirs(path_to, exist_ok=True)
         shutil.move(self.input_dir, path_to)
+
+
+class ScannerLibrary:
+    def __init__(self, root_dir: ExistsDirType):
+        self._root_dir = root_dir
+
+    @property
+    def root_dir(self) -> str:
+        return self._root_dir.value
+
+    def scan_library(self) -> list[str]:
+        result: list[str] = []
+        with os.scandir(self.root_dir) as entries:
+            for entry in entries:
+                if entry.is_dir() and os.path.isdir(os.path.join(entry.path, OBJS)):
+                    result.append(entry.path)
+        result.sort()
+        return result
+
+
+class DctFolderResult(TypedDict):
+    input_dir: str
+    rows: list[dict]
+    error: Optional[str]
+    reasons: list[DctPreflightReason]
+    drift: Optional[DctDecimationDrift]
+
+
+def calculate_folder(
+    input_dir: str,
+    output_dir: str,
+    config_file: str,
+    scale: bool,
+    jobs: int = 1,
+    slice_cache_dir: Optional[str] = None,
+    estimator: Optional[ScaleCurveEstimator] = None,
+    done_scales: Optional[set[float]] = None,
+    mesh_cache_dir: Optional[str] = None,
+    part_timeout: Optional[float] = None,
+    fast_orientation: bool = False,
+    decimate: bool = False,
+    scale_planner: Optional[ScalePlanner] = None,
+    threads: Optional[int] = None
+) -> DctFolderResult:
+    writer = MemoryWriter()
+    try:
+        slice_cache = None
+        if slice_cache_dir is not None:
+            slice_cache = PrusaSliceCache(FileCache(ExistsDirType(slice_cache_dir)))
+        mesh_cache = FileCache(ExistsDirType(mesh_cache_dir)) if mesh_cache_dir is not None else None
+        calculate = CalculatePrint(
+            ExistsDirType(input_dir),
+            ExistsDirType(output_dir),
+            writer,
+            jobs,
+            slice_cache,
+            estimator,
+            done_scales,
+            mesh_cache,
+            part_timeout,
+            fast_orientation,
+            decimate,
+            scale_planner,
+            threads
+        )
+        calculate.calculate(ExistsFileType(config_file), scale)
+    except PreflightError as e:
+        return DctFolderResult(
+            input_dir=input_dir, rows=[], error=f'{type(e).__name__}: {e}', reasons=e.reasons, drift=None
+        )
+    except Exception as e:
+        return DctFolderResult(input_dir=input_dir, rows=[], error=f'{type(e).__name__}: {e}', reasons=[], drift=None)
+    return DctFolderResult(
+        input_dir=input_dir,
+        rows=writer.rows,
+        error=None,
+        reasons=calculate.preflight_reasons,
+        drift=calculate.decimation_drift
+    )
+
+
+def fingerprint_folder(input_dir: str, mesh_cache_dir: Optional[str] = None) -> Optional[str]:
+    try:
+        mesh_cache = FileCache(ExistsDirType(mesh_cache_dir)) if mesh_cache_dir is not None else None
+        return ScannerObjs(ExistsDirType(input_dir)).get_fingerprint(mesh_cache)
+    except Exception:
+        # The folder is calculated alone and reports the error itself
+        return None
+
+
+def render_folder(input_dir: str, output_dir: str) -> DctFolderResult:
+    try:
+        calculate = CalculatePrint(ExistsDirType(input_dir), ExistsDirType(output_dir), MemoryWriter())
+        calculate.render()
+    except Exception as e:
+        return DctFolderResult(input_dir=input_dir, rows=[], error=f'{type(e).__name__}: {e}', reasons=[], drift=None)
+    return DctFolderResult(input_dir=input_dir, rows=[], error=None, reasons=[], drift=calculate.decimation_drift)
+
+
+class BatchCalculatePrint:
+    def __init__(
+        self,
+        root_dir: ExistsDirType,
+        output_dir: ExistsDirType,
+        writer: RowWriterBase,
+        max_workers: Optional[int] = None,
+        slice_cache_dir: Optional[ExistsDirType] = None,
+        estimator: Optional[ScaleCurveEstimator] = None,
+        done: Optional[dict[str, set[float]]] = None,
+        mesh_cache_dir: Optional[ExistsDirType] = None,
+        part_timeout: Optional[float] = None,
+        fast_orientation: bool = False,
+        decimate: bool = False,
+        scale_planner: Optional[ScalePlanner] = None
+    ):
+        self.__root_dir = root_dir
+        self.__output_dir = output_dir
+        self.__writter = writer
+        self.__max_workers = max_workers or os.cpu_count() or 1
+        self.__slice_cache_dir = slice_cache_dir
+        self.__estimator = estimator
+        self.__done = done or {}
+        self.__mesh_cache_dir = mesh_cache_dir
+        self.__part_timeout = part_timeout
+        self.__fast_orientation = fast_orientation
+        self.__decimate = decimate
+        self.__scale_planner = scale_planner
+        self.__drifts: dict[str, DctDecimationDrift] = {}
+
+    @property
+    def root_dir(self) -> ExistsDirType:
+        return self.__root_dir
+
+    @property
+    def output_dir(self) -> ExistsDirType:
+        return self.__output_dir
+
+    @property
+    def writter(self) -> RowWriterBase:
+        return self.__writter
+
+    @property
+    def max_workers(self) -> int:
+        return self.__max_workers
+
+    @property
+    def slice_cache_dir(self) -> Optional[ExistsDirType]:
+        return self.__slice_cache_dir
+
+    @property
+    def estimator(self) -> Optional[ScaleCurveEstimator]:
+        return self.__estimator
+
+    @property
+    def done(self) -> dict[str, set[float]]:
+        return self.__done
+
+    @property
+    def mesh_cache_dir(self) -> Optional[ExistsDirType]:
+        return self.__mesh_cache_dir
+
+    @property
+    def part_timeout(self) -> Optional[float]:
+        return self.__part_timeout
+
+    @property
+    def fast_orientation(self) -> bool:
+        return self.__fast_orientation
+
+    @property
+    def decimate(self) -> bool:
+        return self.__decimate
+
+    @property
+    def scale_planner(self) -> Optional[ScalePlanner]:
+        return self.__scale_planner
+
+    @property
+    def drifts(self) -> dict[str, DctDecimationDrift]:
+        """Decimation drift of every model decimated by the last ``calculate``."""
+        return self.__drifts
+
+    @property
+    def mesh_cache_path(self) -> Optional[str]:
+        return self.mesh_cache_dir.value if self.mesh_cache_dir is not None else None
+
+    def _group_folders(self, executor: ProcessPoolExecutor, folders: list[str]) -> list[list[str]]:
+        """Groups folders holding the same geometry, only the first folder of a group is calculated."""
+        by_fingerprint: dict[str, list[str]] = {}
+        result: list[list[str]] = []
+        fingerprints = executor.map(fingerprint_folder, folders, repeat(self.mesh_cache_path))
+        for folder, fingerprint in zip(folders, fingerprints):
+            if fingerprint is None:
+                result.append([folder])
+            elif fingerprint in by_fingerprint:
+                by_fingerprint[fingerprint].append(folder)
+            else:
+                by_fingerprint[fingerprint] = [folder]
+                result.append(by_fingerprint[fingerprint])
+        return result
+
+    def _write_result(self, result: DctFolderResult, input_dir: str, failed: list[DctFolderResult]) -> None:
+        model = os.path.basename(input_dir)
+        if result['error'] is not None:
+            failed.append(DctFolderResult(
+                input_dir=input_dir, rows=[], error=result['error'], reasons=result['reasons'], drift=None
+            ))
+        if result['drift'] is not None:
+            self.__drifts[model] = result['drift']
+        done_scales = self.done.get(model, set())
+        for row in result['rows']:
+            if get_scale_key(row[CSV_HEADER[1]]) not in done_scales:
+                self.writter.writerow(dict(row, **{CSV_HEADER[0]: model}))
+
+    def calculate(self, config_file: ExistsFileType, scale: bool) -> list[DctFolderResult]:
+        # Folders with every scale in the results store are not even submitted
+        scales_count = get_scales_count(scale)
+        folders = [
+            folder for folder in ScannerLibrary(self.root_dir).scan_library()
+            if len(self.done.get(os.path.basename(folder), ())) < scales_count
+        ]
+        failed: list[DctFolderResult] = []
+        with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+            # Copies of a model are fingerprinted first and then calculated once
+            groups = iter(self._group_folders(executor, folders))
+            submitted: dict[Future, list[str]] = {}
+
+            def submit(group: list[str]) -> Future:
+                # The first folder skips only the scales every copy already has
+                done_scales = set.intersection(*(set(self.done.get(os.path.basename(f), ())) for f in group))
+                future = executor.submit(
+                    calculate_folder,
+                    group[0],
+                    self.output_dir.value,
+                    config_file.value,
+                    scale,
+                    slice_cache_dir=self.slice_cache_dir.value if self.slice_cache_dir is not None else None,
+                    estimator=self.estimator,
+                    done_scales=done_scales,
+                    mesh_cache_dir=self.mesh_cache_path,
+                    part_timeout=self.part_timeout,
+                    fast_orientation=self.fast_orientation,
+                    decimate=self.decimate,
+                    scale_planner=self.scale_planner,
+                    # Every worker slices next to the others, the cores are shared among all of them
+                    threads=get_threads_per_job(self.max_workers)
+                )
+                submitted[future] = group
+                return future
+
+            # Keep only a couple of folders per worker in flight instead of
+            # queueing the whole library up front.
+            pending = set(map(submit, islice(groups, self.max_workers * 2)))
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    result: DctFolderResult = future.result()
+                    for input_dir in submitted.pop(future):
+                        self._write_result(result, input_dir, failed)
+                    pending.update(map(submit, islice(groups, 1)))
+        return failed
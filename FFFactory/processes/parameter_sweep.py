@@ -0,0 +1,164 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+from itertools import product
+from tempfile import TemporaryDirectory
+from typing import Any, Optional, Sequence
+
+from FFFactory.utils.auto_slicer import DctGcodeStats, PrusaSlicer, PrusaSliceCache
+from FFFactory.utils.auto_slicer.prusa_slicer.prusa_config import DctPrusaGroupOptions
+from FFFactory.utils.auto_slicer.slicer_types import FlagOptionType, NOptionType, XOptionType
+from FFFactory.utils.csv_tools import RowWriterBase
+from FFFactory.utils.systems_util import ExistsDirType, ExistsFileType
+from .calculate_print import CSV_HEADER, ScalerGroupBase, get_price, get_prusa_slicer
+
+
+OPTION_SEPARATOR = '.'
+SWEEP_SLICED_HEADER = [CSV_HEADER[1], CSV_HEADER[2], CSV_HEADER[3], CSV_HEADER[4]]
+
+
+def to_option_value(value: Any) -> Any:
+    if value is True:
+        return FlagOptionType()
+    if value is False or value is None:
+        return None
+    if isinstance(value, int):
+        return NOptionType(value)
+    if isinstance(value, (float, Decimal)):
+        return XOptionType(Decimal(str(value)))
+    return str(value)
+
+
+def parse_override_value(value: str) -> Any:
+    for convert in (int, Decimal):
+        try:
+            return convert(value)
+        except (ValueError, ArithmeticError):
+            pass
+    return value
+
+
+def split_option_key(key: str) -> tuple[str, str]:
+    group_name, _, option_name = key.partition(OPTION_SEPARATOR)
+    if group_name not in DctPrusaGroupOptions.__annotations__ or not option_name:
+        raise ValueError('Unknown slicer option: %s' % key)
+    return group_name, option_name
+
+
+class ParameterSweep:
+    """Slices one model for every combination of the given slicer option overrides.
+
+    Keys of ``overrides`` are ``<group>.<option>`` names of ``DctPrusaGroupOptions``,
+    for example ``infill_options.fill_density``.
+    """
+
+    def __init__(
+        self,
+        input_dir: ExistsDirType,
+        config_file: ExistsFileType,
+        scaler_group: ScalerGroupBase,
+        overrides: dict[str, Sequence[Any]],
+        jobs: int = 1,
+        slice_cache: Optional[PrusaSliceCache] = None
+    ):
+        for key in overrides:
+            split_option_key(key)
+        self._input_dir = input_dir
+        self._config_file = config_file
+        self._scaler_group = scaler_group
+        self._overrides = overrides
+        self._jobs = max(1, jobs)
+        self._slice_cache = slice_cache
+
+    @property
+    def input_dir(self) -> ExistsDirType:
+        return self._input_dir
+
+    @property
+    def overrides(self) -> dict[str, Sequence[Any]]:
+        return self._overrides
+
+    @property
+    def jobs(self) -> int:
+        return self._jobs
+
+    def get_variants(self) -> list[dict[str, Any]]:
+        keys = list(self.overrides.keys())
+        return [dict(zip(keys, values)) for values in product(*self.overrides.values())]
+
+    def _get_prusa_slicer(self, variant: dict[str, Any]) -> PrusaSlicer:
+        prusa_slicer = get_prusa_slicer(self._config_file, self.jobs, self._slice_cache)
+        for key, value in variant.items():
+            group_name, option_name = split_option_key(key)
+            setattr(prusa_slicer.config.sliced_options[group_name], option_name, to_option_value(value))  # type: ignore
+        return prusa_slicer
+
+    @staticmethod
+    def _get_variant_key(variant: dict[str, Any]) -> tuple:
+        # Compare normalized values so 2, 2.0 and Decimal('2.00') are one variant
+        result = []
+        for key, value in sorted(variant.items()):
+            option_value = to_option_value(value)
+            if isinstance(option_value, XOptionType):
+                option_value = option_value.value.normalize()
+            result.append((key, str(option_value)))
+        return tuple(result)
+
+    def _slice(
+        self,
+        model: str,
+        variant: dict[str, Any],
+        size: tuple[Decimal, Decimal, Decimal],
+        output_dir: str
+    ) -> DctGcodeStats:
+        prusa_slicer = self._get_prusa_slicer(variant)
+        prusa_slicer.set_scale_to_fit(*size)
+        return prusa_slicer.export_gcode(model, output_dir)['gcode_stats']
+
+    def sweep(self, writer: Optional[RowWriterBase] = None) -> list[dict]:
+        # Rows are named after the input folder, like the quote rows, not the fixed mesh
+        model_name = os.path.basename(os.path.normpath(self.input_dir.value))
+        # Repair and orientation run once, every variant slices the fixed mesh
+        sizes = list(self._scaler_group.scale())
+        model = self._scaler_group.model
+        combinations = [(variant, size) for variant in self.get_variants() for size in sizes]
+        unique: dict[tuple, tuple[dict[str, Any], tuple[Decimal, Decimal, Decimal]]] = {}
+        for variant, size in combinations:
+            unique.setdefault((self._get_variant_key(variant), size), (variant, size))
+
+        with TemporaryDirectory() as temp_dir, ThreadPoolExecutor(max_workers=self.jobs) as executor:
+            output_dirs = []
+            for i in range(len(unique)):
+                output_dir = os.path.join(temp_dir, str(i))
+                os.makedirs(output_dir)
+                output_dirs.append(output_dir)
+            sliced = dict(zip(unique.keys(), executor.map(
+                lambda args, output_dir: self._slice(model, *args, output_dir),
+                unique.values(),
+                output_dirs
+            )))
+
+        rows: list[dict] = []
+        for variant, size in combinations:
+            gcode_stats = sliced[(self._get_variant_key(variant), size)]
+            row = {
+                CSV_HEADER[0]: model_name,
+                **variant,
+                CSV_HEADER[1]: size[2],
+                CSV_HEADER[2]: gcode_stats['print_time_sec'],
+                CSV_HEADER[3]: Decimal(str(round(gcode_stats['filament_used_g'], 2))),
+                CSV_HEADER[4]: get_price(gcode_stats['print_time_sec'], gcode_stats['filament_used_g']),
+            }
+            rows.append(row)
+            if writer is not None:
+                writer.writerow(row)
+        return rows
+
+    def get_fieldnames(self) -> list[str]:
+        return [CSV_HEADER[0], *self.overrides.keys(), *SWEEP_SLICED_HEADER]
+
+
+__all__ = [
+    'ParameterSweep',
+    'parse_override_value',
+]
@@ -0,0 +1,226 @@
+import asyncio
+import json
+import os
+import signal
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import Any, Callable, Optional, TypedDict
+
+from FFFactory.utils.scale_curve import ScaleCurveEstimator
+from FFFactory.utils.systems_util import get_threads_per_job
+from .calculate_print import DctFolderResult, calculate_folder, render_folder
+
+
+DEFAULT_SOCKET_PATH = os.path.join(tempfile.gettempdir(), 'fffactory.sock')
+DEFAULT_MAX_QUEUE = 64
+
+JOB_QUOTE = 'quote'
+JOB_RENDER = 'render'
+
+STATUS_QUEUED = 'queued'
+STATUS_MERGED = 'merged'
+STATUS_RUNNING = 'running'
+STATUS_DONE = 'done'
+STATUS_ERROR = 'error'
+
+
+class DctQuoteRequest(TypedDict, total=False):
+    id: Any
+    type: str
+    input_dir: str
+    slicer_config: str
+    scale: bool
+    estimate: bool
+    decimate: bool
+
+
+class QuoteJob:
+    def __init__(self, key: str, func: Callable[..., DctFolderResult], args: tuple, kwargs: dict[str, Any]):
+        self.key = key
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+        self.started = asyncio.Event()
+        self.result: asyncio.Future = asyncio.get_running_loop().create_future()
+
+
+class QuoteDaemon:
+    """Resident quote and render service behind a Unix domain socket.
+
+    Requests and responses are JSON objects, one per line. Every request is
+    answered with ``queued`` (or ``merged`` when an identical job is already
+    pending), ``running`` and finally ``done`` or ``error``.
+    """
+
+    def __init__(
+        self,
+        output_dir: str,
+        socket_path: str = DEFAULT_SOCKET_PATH,
+        max_workers: Optional[int] = None,
+        max_queue: int = DEFAULT_MAX_QUEUE,
+        slice_cache_dir: Optional[str] = None,
+        mesh_cache_dir: Optional[str] = None
+    ):
+        self._output_dir = output_dir
+        self._socket_path = socket_path
+        self._max_workers = max_workers or os.cpu_count() or 1
+        self._max_queue = max_queue
+        self._slice_cache_dir = slice_cache_dir
+        self._mesh_cache_dir = mesh_cache_dir
+        self._jobs: dict[str, QuoteJob] = {}
+        self._draining = False
+
+    @property
+    def socket_path(self) -> str:
+        return self._socket_path
+
+    @property
+    def max_workers(self) -> int:
+        return self._max_workers
+
+    def _get_job_args(
+        self,
+        request: DctQuoteRequest
+    ) -> tuple[Callable[..., DctFolderResult], tuple, dict[str, Any]]:
+        job_type = request.get('type', JOB_QUOTE)
+        input_dir = os.path.abspath(request['input_dir'])
+        if job_type == JOB_RENDER:
+            return render_folder, (input_dir, self._output_dir), {}
+        if job_type == JOB_QUOTE:
+            return calculate_folder, (input_dir, self._output_dir), dict(
+                config_file=os.path.abspath(request['slicer_config']),
+                scale=bool(request.get('scale', False)),
+                slice_cache_dir=self._slice_cache_dir,
+                estimator=ScaleCurveEstimator() if request.get('estimate') else None,
+                mesh_cache_dir=self._mesh_cache_dir,
+                decimate=bool(request.get('decimate', False)),
+                # Every worker runs its own slicer, the cores are shared between them
+                threads=get_threads_per_job(self.max_workers),
+            )
+        raise ValueError('Unknown job type: %s' % job_type)
+
+    @staticmethod
+    def _get_job_key(request: DctQuoteRequest) -> str:
+        return json.dumps({k: v for k, v in request.items() if k != 'id'}, sort_keys=True)
+
+    async def _send(self, writer: asyncio.StreamWriter, request_id: Any, status: str, **kwargs) -> None:
+        message = {'id': request_id, 'status': status, **kwargs}
+        writer.write(json.dumps(message, default=str).encode() + b'\n')
+        await writer.drain()
+
+    async def _queue_request(
+        self,
+        queue: asyncio.Queue,
+        writer: asyncio.StreamWriter,
+        line: bytes
+    ) -> Optional[tuple[Any, QuoteJob]]:
+        """Queues the job of a request or merges the request into the pending identical job."""
+        request_id = None
+        try:
+            request: DctQuoteRequest = json.loads(line)
+            request_id = request.get('id')
+            if self._draining:
+                raise RuntimeError('Daemon is shutting down')
+            key = self._get_job_key(request)
+            job = self._jobs.get(key)
+            if job is not None:
+                await self._send(writer, request_id, STATUS_MERGED)
+                return request_id, job
+            job = QuoteJob(key, *self._get_job_args(request))
+            await self._send(writer, request_id, STATUS_QUEUED)
+            # Blocks the client while the queue is full
+            await queue.put(job)
+        except (ConnectionError, asyncio.CancelledError):
+            raise
+        except Exception as e:
+            await self._send(writer, request_id, STATUS_ERROR, error=f'{type(e).__name__}: {e}')
+            return None
+        # Registered only once queued, a job that never got into the queue would hold its merges forever
+        self._jobs[key] = job
+        return request_id, job
+
+    async def _answer_request(self, writer: asyncio.StreamWriter, request_id: Any, job: QuoteJob) -> None:
+        await job.started.wait()
+        await self._send(writer, request_id, STATUS_RUNNING)
+        result: DctFolderResult = await asyncio.shield(job.result)
+        if result['error'] is not None:
+            await self._send(writer, request_id, STATUS_ERROR, error=result['error'])
+        else:
+            await self._send(writer, request_id, STATUS_DONE, rows=result['rows'], drift=result['drift'])
+
+    async def _handle_client(
+        self,
+        queue: asyncio.Queue,
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter
+    ) -> None:
+        tasks: set[asyncio.Task] = set()
+        try:
+            async for line in reader:
+                if not line.strip():
+                    continue
+                # Queuing is awaited before the next line is read, so a full queue stops reading the socket
+                queued = await self._queue_request(queue, writer, line)
+                if queued is None:
+                    continue
+                task = asyncio.ensure_future(self._answer_request(writer, *queued))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            await asyncio.gather(*tasks, return_exceptions=True)
+        finally:
+            writer.close()
+
+    async def _run_jobs(self, queue: asyncio.Queue, executor: ProcessPoolExecutor) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            job: QuoteJob = await queue.get()
+            job.started.set()
+            try:
+                job.result.set_result(await loop.run_in_executor(executor, partial(job.func, *job.args, **job.kwargs)))
+            except Exception as e:
+                job.result.set_result(DctFolderResult(
+                    input_dir=job.args[0], rows=[], error=f'{type(e).__name__}: {e}', reasons=[], drift=None
+                ))
+            finally:
+                self._jobs.pop(job.key, None)
+                queue.task_done()
+
+    async def serve(self) -> None:
+        loop = asyncio.get_running_loop()
+        stop = asyncio.Event()
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            loop.add_signal_handler(sig, stop.set)
+
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self._max_queue)
+        if os.path.exists(self.socket_path):
+            os.remove(self.socket_path)
+        with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+            workers = [
+                asyncio.ensure_future(self._run_jobs(queue, executor))
+                for _ in range(self.max_workers)
+            ]
+            server = await asyncio.start_unix_server(
+                lambda r, w: self._handle_client(queue, r, w),
+                path=self.socket_path
+            )
+            try:
+                await stop.wait()
+                # Stop taking work, then let the queued jobs finish
+                self._draining = True
+                server.close()
+                await queue.join()
+            finally:
+                for worker in workers:
+                    worker.cancel()
+                await asyncio.gather(*workers, return_exceptions=True)
+                server.close()
+                if os.path.exists(self.socket_path):
+                    os.remove(self.socket_path)
+
+
+__all__ = [
+    'QuoteDaemon',
+    'DEFAULT_MAX_QUEUE',
+    'DEFAULT_SOCKET_PATH',
+]
@@ -5,9 +5,12 @@ from FFFactory.utils.systems_util import ExistsDirType, ExistsFileType
 
 from contextlib import contextmanager
 from math import radians
-from typing import Generator, Tuple
+from typing import Generator, Optional, Tuple
 import bpy
+import numpy as np
 import os
+from FFFactory.utils.mesh_tools.indexed_mesh import IndexedMesh
+from FFFactory.utils.mesh_tools.mesh_decimation import DctDecimationDrift, decimate_mesh, get_drift
 from ..render_types import DctModelRenderConfig
 from .consts import MODEL_NAME, MATERIAL_NAME, TEMP_FILE_NAME, CAMERA_NAME, TEMP_COLLECTION_NAME, DOT_BLEND
 
@@ -44,6 +47,23 @@ class BlenderModelHandler:
             else:
                 model.data.materials.append(material)
 
+    def decimate_model(self, model: bpy.types.Object, target_faces: int) -> DctDecimationDrift:
+        mesh_data = model.data
+        mesh_data.calc_loop_triangles()
+        vertices = np.empty(len(mesh_data.vertices) * 3, dtype=np.float32)
+        mesh_data.vertices.foreach_get('co', vertices)
+        faces = np.empty(len(mesh_data.loop_triangles) * 3, dtype=np.int32)
+        mesh_data.loop_triangles.foreach_get('vertices', faces)
+        mesh = IndexedMesh(vertices, faces)
+        decimated = decimate_mesh(mesh, target_faces)
+        if decimated is not mesh:
+            preview = bpy.data.meshes.new(mesh_data.name)
+            preview.from_pydata(decimated.vertices.tolist(), [], decimated.faces.tolist())
+            for material in mesh_data.materials:
+                preview.materials.append(material)
+            model.data = preview
+        return get_drift(mesh, decimated)
+
     def save_file(self, filepath: str) -> None:
         bpy.ops.wm.save_as_mainfile(filepath=filepath)
 
@@ -96,6 +116,7 @@ class RenderTemplate:
         self._template_path = template_path
         self._template_name = template_name
         self._type = type
+        self._preview_drift: Optional[DctDecimationDrift] = None
 
     @property
     def type(self) -> str:
@@ -109,6 +130,10 @@ class RenderTemplate:
     def template_path(self) -> str:
         return self._template_path.value
 
+    @property
+    def preview_drift(self) -> Optional[DctDecimationDrift]:
+        return self._preview_drift
+
     def render_image(self, config: DctModelRenderConfig) -> None:
         file_name = os.path.basename(config['file_name']).removesuffix(DOT_BLEND)
         with blender_context(config['file_path']) as handler:
@@ -116,6 +141,9 @@ class RenderTemplate:
             handler.load_data_from_temp_file()
 
             imported_model = handler.link_model_to_scene()
+            # Previews do not need every facet of a scan
+            if config.get('preview_max_facets'):
+                self._preview_drift = handler.decimate_model(imported_model, config['preview_max_facets'])
             handler.apply_material_to_model(imported_model)
             for i, angle in enumerate(range(-1, config['max_rotation_z'], config['angle_rotation_z']), 1):
                 handler.rotate_model(imported_model, (0, 0, angle))
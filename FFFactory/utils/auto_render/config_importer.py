@@ -43,6 +43,7 @@ class BlenderConfigImporter(ConfigImporterBase):
                     save_project=yaml_output['save_project'],
                     always_rerender=yaml_output['always_rerender'],
                     number_imgs=lst_number_img,  # type: ignore
+                    preview_max_facets=yaml_output.get('preview_max_facets'),
                 ))
         return result
 
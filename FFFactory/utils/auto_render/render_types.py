@@ -34,6 +34,7 @@ class DctModelRenderConfig(TypedDict):
     save_project: bool
     always_rerender: bool
     number_imgs: list[int]
+    preview_max_facets: Optional[int]
 
 
 __all__ = [
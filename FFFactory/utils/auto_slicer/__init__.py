@@ -1 +1,7 @@
-from .prusa_slicer import PrusaSlicer, PrusaOutputFilenameFormatFdm  # noqa: F401
+from .prusa_slicer import (  # noqa: F401
+    PrusaSlicer,
+    PrusaSliceCache,
+    PrusaOutputFilenameFormatFdm,
+    DctGcodeStats,
+    PrusaGcodeMetadataReader,
+)
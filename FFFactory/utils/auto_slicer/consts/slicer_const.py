@@ -3,3 +3,4 @@ FILE_TYPES_BLENDER = ['.blend']
 
 SCALE_MM = [100, 150, 200, 250, 300, 350, 400, 450, 500]
 MAX_SIZE_X_Y = [420, 420]
+MAX_SIZE_Z = 420
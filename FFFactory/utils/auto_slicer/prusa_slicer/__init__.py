@@ -1,3 +1,5 @@
 from .prusa_slicer import PrusaSlicer  # noqa: F401
 from .prusa_config import PrusaSlicerConfig  # noqa: F401
+from .prusa_cache import PrusaSliceCache  # noqa: F401
 from .prusa_types import PrusaOutputFilenameFormatFdm  # noqa: F401
+from .prusa_gcode import DctGcodeStats, PrusaGcodeMetadataReader  # noqa: F401
@@ -1,13 +1,25 @@
-from .prusa_cmd_tools import DctExportGcode, DctInfoAboutModel, PrusaExportGcodeCmdRunner, PrusaGetInfoAboutModelCmdRunner
+from typing import Coroutine, Any, Optional
+
+from .prusa_cmd_tools import (
+    DctExportGcode,
+    DctInfoAboutModel,
+    PrusaExportGcodeCmdRunner,
+    PrusaExportGcodeAsyncCmdRunner,
+    PrusaGetInfoAboutModelCmdRunner,
+    PrusaGetInfoAboutModelAsyncCmdRunner,
+)
 from ..slicer_types import FlagOptionType
+from FFFactory.utils.mesh_tools.mesh_info import get_mesh_info, is_native_info_supported
 from FFFactory.utils.systems_util import ExistsDirType
 from ..slicer_types import SlicerActionsRunnerBase
+from .prusa_cache import PrusaSliceCache
 from .prusa_config import PrusaSlicerConfig
 from .prusa_types import PrusaOutputFilenameFormatFdm as OutPutFdm
 
 
 class PrusaActionsRunner(SlicerActionsRunnerBase):
     _output_file_format = f'{OutPutFdm.INPUT_FILENAME_BASE}___T{OutPutFdm.PRINT_TIME}'
+    _slice_cache: Optional[PrusaSliceCache] = None
 
     def __init__(self, config: PrusaSlicerConfig):
         super().__init__(config)
@@ -16,13 +28,37 @@ class PrusaActionsRunner(SlicerActionsRunnerBase):
     def config(self) -> PrusaSlicerConfig:
         return self._config  # type: ignore
 
-    def export_gcode(self, input_file: str, output_dir: str) -> DctExportGcode:
-        cmd_runner = PrusaExportGcodeCmdRunner(self.config.slicer_path)
+    @property
+    def slice_cache(self) -> Optional[PrusaSliceCache]:
+        return self._slice_cache
+
+    @slice_cache.setter
+    def slice_cache(self, value: Optional[PrusaSliceCache]):
+        self._slice_cache = value
+
+    def _set_export_gcode_options(self, input_file: str, output_dir: str) -> None:
         self.config.actions_options.export_gcode = FlagOptionType()
         self.config.sliced_options['other_options'].output = ExistsDirType(output_dir)
         self.config.sliced_options['misc_options'].output_filename_format = self.output_file_format
         self.config.files_options.add_files(input_file)
-        return cmd_runner.run(self.config.all_options, output_dir)
+
+    def export_gcode(self, input_file: str, output_dir: str) -> DctExportGcode:
+        cmd_runner = PrusaExportGcodeCmdRunner(self.config.slicer_path)
+        self._set_export_gcode_options(input_file, output_dir)
+        cmd = self.config.all_options
+        if self.slice_cache is None:
+            return cmd_runner.run(cmd, output_dir)
+        return self.slice_cache.get_or_slice(cmd, lambda: cmd_runner.run(cmd, output_dir))
+
+    def export_gcode_async(
+        self,
+        input_file: str,
+        output_dir: str,
+        timeout: Optional[float] = None
+    ) -> Coroutine[Any, Any, DctExportGcode]:
+        cmd_runner = PrusaExportGcodeAsyncCmdRunner(self.config.slicer_path, timeout)
+        self._set_export_gcode_options(input_file, output_dir)
+        return cmd_runner.run_async(self.config.all_options, output_dir)
 
     def export_3mf(self, input_file: str, output_dir: str) -> str:
         pass
@@ -42,8 +78,20 @@ class PrusaActionsRunner(SlicerActionsRunnerBase):
     def save_config_file(self, output_file: str) -> str:
         pass
 
-    def get_info(self, input_file: str) -> list[DctInfoAboutModel]:
+    def get_info(self, input_file: str, use_slicer: bool = False) -> list[DctInfoAboutModel]:
+        if not use_slicer and is_native_info_supported(input_file):
+            return [get_mesh_info(input_file)]
         cmd_runner = PrusaGetInfoAboutModelCmdRunner(self.config.slicer_path)
         self.config.actions_options.info = FlagOptionType()
         self.config.files_options.add_files(input_file)
         return cmd_runner.run(self.config.all_options)
+
+    def get_info_async(
+        self,
+        input_file: str,
+        timeout: Optional[float] = None
+    ) -> Coroutine[Any, Any, list[DctInfoAboutModel]]:
+        cmd_runner = PrusaGetInfoAboutModelAsyncCmdRunner(self.config.slicer_path, timeout)
+        self.config.actions_options.info = FlagOptionType()
+        self.config.files_options.add_files(input_file)
+        return cmd_runner.run_async(self.config.all_options)
@@ -0,0 +1,112 @@
+import hashlib
+import os
+import shlex
+import subprocess
+from functools import cache
+from typing import Callable, Optional, TypedDict
+
+from FFFactory.utils.cache_tools import DctCacheStats, FileCache, file_sha256
+from FFFactory.utils.systems_util import ExistsFileType
+from .prusa_cmd_tools import DctExportGcode
+from .prusa_gcode import DctGcodeStats
+
+
+# Bumped whenever the stored entry changes shape
+SLICE_CACHE_FORMAT = '2'
+# Options that change where or how fast the slicer works, not what it produces
+IGNORED_OPTIONS = ('--output', '--threads')
+
+
+@cache
+def get_slicer_version(slicer_path: str) -> str:
+    result = subprocess.run([slicer_path, '--help'], capture_output=True, text=True, timeout=60)
+    lines = result.stdout.splitlines()
+    return lines[0].strip() if lines else ''
+
+
+class DctSliceCacheEntry(TypedDict):
+    output_file_name: str
+    print_warning: bool
+    time_slice_sec: int
+    gcode_stats: DctGcodeStats
+    gcode_file: Optional[str]
+
+
+class PrusaSliceCache:
+    def __init__(self, file_cache: FileCache, keep_gcode: bool = False):
+        self._file_cache = file_cache
+        self._keep_gcode = keep_gcode
+        self._hits = 0
+        self._misses = 0
+
+    @property
+    def file_cache(self) -> FileCache:
+        return self._file_cache
+
+    @property
+    def keep_gcode(self) -> bool:
+        return self._keep_gcode
+
+    @staticmethod
+    def get_key(cmd: list[str]) -> str:
+        argv = shlex.split(' '.join(cmd))
+        canonical = [SLICE_CACHE_FORMAT, get_slicer_version(argv[0])]
+        args = iter(argv[1:])
+        for arg in args:
+            if arg in IGNORED_OPTIONS:
+                next(args, None)
+                continue
+            # Input meshes and loaded configs are keyed by content, not by path
+            if os.path.isfile(arg):
+                arg = 'sha256:' + file_sha256(arg)
+            canonical.append(arg)
+        return hashlib.sha256('\0'.join(canonical).encode()).hexdigest()
+
+    def _get_cached(self, key: str) -> Optional[DctExportGcode]:
+        entry: Optional[DctSliceCacheEntry] = self.file_cache.get_json(key + '.json')
+        if entry is None:
+            return None
+        gcode_path = None
+        if entry['gcode_file'] is not None:
+            gcode_path = self.file_cache.get_path(entry['gcode_file'])
+        return DctExportGcode(
+            output_file_name=entry['output_file_name'],
+            print_warning=entry['print_warning'],
+            time_slice_sec=entry['time_slice_sec'],
+            gcode_stats=entry['gcode_stats'],
+            output_file_path=ExistsFileType(gcode_path) if gcode_path is not None else None,
+        )
+
+    def get_or_slice(self, cmd: list[str], slice_func: Callable[[], DctExportGcode]) -> DctExportGcode:
+        key = self.get_key(cmd)
+        cached = self._get_cached(key)
+        if cached is not None:
+            self._hits += 1
+            return cached
+        self._misses += 1
+        result = slice_func()
+        gcode_file = None
+        if self.keep_gcode and result['output_file_path'] is not None:
+            gcode_file = key + '.gcode'
+            self.file_cache.put_file(gcode_file, result['output_file_path'].value)
+        self.file_cache.put_json(key + '.json', DctSliceCacheEntry(
+            output_file_name=result['output_file_name'],
+            print_warning=result['print_warning'],
+            time_slice_sec=result['time_slice_sec'],
+            gcode_stats=result['gcode_stats'],
+            gcode_file=gcode_file,
+        ))
+        return result
+
+    @property
+    def stats(self) -> DctCacheStats:
+        stats = self.file_cache.stats
+        stats['hits'] = self._hits
+        stats['misses'] = self._misses
+        return stats
+
+
+__all__ = [
+    'PrusaSliceCache',
+    'get_slicer_version',
+]
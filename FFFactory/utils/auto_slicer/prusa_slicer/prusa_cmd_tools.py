@@ -1,10 +1,16 @@
 import os
 import re
+import shlex
 import tomllib
 from time import perf_counter
-from typing import Generator, TypedDict
+from typing import Generator, Optional, TypedDict
+from FFFactory.utils.mesh_tools.mesh_types import DctInfoAboutModel
 from FFFactory.utils.systems_util import ExistsFileType
-from ..slicer_types import SlicerCmdRunnerBase, SlicerCmdParserBase
+from ..slicer_types import SlicerCmdRunnerBase, SlicerAsyncCmdRunnerBase, SlicerCmdParserBase
+from .prusa_gcode import DctGcodeStats, PrusaGcodeMetadataReader
+
+
+EXPORT_GCODE_STOP_LINE = 'Slicing result exported to'
 
 
 class PrusaSlicerCmdRunnerBase(SlicerCmdRunnerBase):
@@ -14,11 +20,19 @@ class PrusaSlicerCmdRunnerBase(SlicerCmdRunnerBase):
         return result
 
 
+class PrusaSlicerAsyncCmdRunnerBase(SlicerAsyncCmdRunnerBase):
+    def _get_argv(self, cmd: list[str]) -> list[str]:
+        # Option values are quoted for the shell by the serializer, split them
+        # the same way the shell would before exec-ing the slicer directly.
+        return shlex.split(' '.join(cmd))
+
+
 class DctExportGcode(TypedDict):
     output_file_name: str
-    output_file_path: ExistsFileType
+    output_file_path: Optional[ExistsFileType]
     print_warning: bool
     time_slice_sec: int
+    gcode_stats: DctGcodeStats
 
 
 class PrusaExportGcodeParser(SlicerCmdParserBase):
@@ -28,12 +42,14 @@ class PrusaExportGcodeParser(SlicerCmdParserBase):
         if not slicing_result:
             raise Exception('Slicing result not found in output: \n%s' % result)
         output_file_name: str = slicing_result[0].replace(os.path.join(output_dir, ''), '')
+        output_file_path = ExistsFileType(slicing_result[0])
 
         return DctExportGcode(
             output_file_name=output_file_name,
             time_slice_sec=int(stop_perf_counter),
             print_warning='print warning:' in result,
-            output_file_path=ExistsFileType(slicing_result[0])
+            output_file_path=output_file_path,
+            gcode_stats=PrusaGcodeMetadataReader(output_file_path).read()
         )
 
 
@@ -45,24 +61,22 @@ class PrusaExportGcodeCmdRunner(PrusaSlicerCmdRunnerBase):
         return super().run(cmd, output_dir=output_dir)
 
 
-class DctInfoAboutModel(TypedDict):
-    file_name: str
-    size_x: float
-    size_y: float
-    size_z: float
-    min_x: float
-    min_y: float
-    min_z: float
-    max_x: float
-    max_y: float
-    max_z: float
-    number_of_facets: int
-    manifold: bool
-    open_edges: int
-    facets_reversed: int
-    backwards_edges: int
-    number_of_parts: int
-    volume: float
+class PrusaExportGcodeAsyncCmdRunner(PrusaSlicerAsyncCmdRunnerBase):
+    _STOP_LINE = EXPORT_GCODE_STOP_LINE
+
+    def __init__(self, slicer_path: str, timeout: Optional[float] = None):
+        super().__init__(ExistsFileType(slicer_path), PrusaExportGcodeParser(), timeout)
+
+    def run(self, cmd: list[str], output_dir: str) -> DctExportGcode:  # type: ignore
+        return super().run(cmd, output_dir=output_dir)
+
+    async def run_async(  # type: ignore
+        self,
+        cmd: list[str],
+        output_dir: str,
+        timeout: Optional[float] = None
+    ) -> DctExportGcode:
+        return await super().run_async(cmd, timeout, output_dir=output_dir)
 
 
 class PrusaGetInfoAboutModelParser(SlicerCmdParserBase):
@@ -131,7 +145,25 @@ class PrusaGetInfoAboutModelCmdRunner(PrusaSlicerCmdRunnerBase):
         return super().run(cmd)
 
 
+class PrusaGetInfoAboutModelAsyncCmdRunner(PrusaSlicerAsyncCmdRunnerBase):
+    def __init__(self, slicer_path: str, timeout: Optional[float] = None):
+        super().__init__(ExistsFileType(slicer_path), PrusaGetInfoAboutModelParser(), timeout)
+
+    def run(self, cmd: list[str], **kwargs) -> list[DctInfoAboutModel]:
+        return super().run(cmd)
+
+    async def run_async(  # type: ignore
+        self,
+        cmd: list[str],
+        timeout: Optional[float] = None,
+        **kwargs
+    ) -> list[DctInfoAboutModel]:
+        return await super().run_async(cmd, timeout)
+
+
 __all__ = [
     'PrusaExportGcodeCmdRunner',
+    'PrusaExportGcodeAsyncCmdRunner',
     'PrusaGetInfoAboutModelCmdRunner',
+    'PrusaGetInfoAboutModelAsyncCmdRunner',
 ]
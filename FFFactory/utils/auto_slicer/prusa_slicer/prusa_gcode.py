@@ -0,0 +1,131 @@
+import mmap
+import re
+from typing import Optional, TypedDict
+
+from FFFactory.utils.systems_util import ExistsFileType
+
+
+GCODE_TAIL_START_SIZE = 64 * 1024
+GCODE_TAIL_MAX_SIZE = 16 * 1024 * 1024
+
+CONFIG_BEGIN = b'; prusaslicer_config = begin'
+METADATA_PATTERN = re.compile(rb'^; ([^=\n]+?) = ([^\n]*?)\r?$', re.MULTILINE)
+PRINT_TIME_PATTERN = re.compile(r'(\d+)\s*([dhms])')
+PRINT_TIME_UNITS = {'d': 24 * 60 * 60, 'h': 60 * 60, 'm': 60, 's': 1}
+
+PRINT_TIME = 'estimated printing time (normal mode)'
+SILENT_PRINT_TIME = 'estimated printing time (silent mode)'
+FIRST_LAYER_PRINT_TIME = 'estimated first layer printing time (normal mode)'
+FILAMENT_USED_MM = 'filament used [mm]'
+FILAMENT_USED_CM3 = 'filament used [cm3]'
+FILAMENT_USED_G = 'filament used [g]'
+TOTAL_FILAMENT_USED_G = 'total filament used [g]'
+FILAMENT_COST = 'filament cost'
+TOTAL_FILAMENT_COST = 'total filament cost'
+TOTAL_LAYERS = 'total layers count'
+
+REQUIRED_METADATA = (PRINT_TIME, FILAMENT_USED_G)
+
+
+class DctGcodeStats(TypedDict):
+    print_time_sec: int
+    silent_print_time_sec: Optional[int]
+    first_layer_print_time_sec: Optional[int]
+    filament_used_mm: float
+    filament_used_cm3: float
+    filament_used_g: float
+    total_cost: float
+    total_layers: Optional[int]
+
+
+def print_time_to_seconds(print_time: str) -> int:
+    return sum(
+        int(value) * PRINT_TIME_UNITS[unit]
+        for value, unit in PRINT_TIME_PATTERN.findall(print_time)
+    )
+
+
+def sum_gcode_stats(stats: list[DctGcodeStats]) -> DctGcodeStats:
+    """Statistics of printing the parts one after another, a value missing for a part is missing for all."""
+    result = {}
+    for key in DctGcodeStats.__annotations__:
+        values = [part[key] for part in stats]  # type: ignore
+        result[key] = None if any(value is None for value in values) else sum(values)
+    return DctGcodeStats(**result)  # type: ignore
+
+
+def _sum_values(value: str) -> float:
+    # Multi extruder printers list one value per extruder
+    return sum(float(v) for v in value.split(',') if v.strip())
+
+
+class PrusaGcodeMetadataReader:
+    """Reads the statistics PrusaSlicer writes in the comments at the end of a G-code.
+
+    The file is memory mapped and only a growing window from its end is
+    scanned, so the G-code body is never read.
+    """
+
+    def __init__(self, gcode_file: ExistsFileType):
+        self._gcode_file = gcode_file
+
+    @property
+    def gcode_file(self) -> str:
+        return self._gcode_file.value
+
+    @staticmethod
+    def _parse_tail(tail: bytes) -> dict[str, str]:
+        config_begin = tail.rfind(CONFIG_BEGIN)
+        if config_begin != -1:
+            tail = tail[:config_begin]
+        return {
+            key.decode(errors='replace'): value.decode(errors='replace')
+            for key, value in METADATA_PATTERN.findall(tail)
+        }
+
+    def read_metadata(self) -> dict[str, str]:
+        with open(self.gcode_file, 'rb') as f:
+            if f.seek(0, 2) == 0:
+                return {}
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                tail_size = GCODE_TAIL_START_SIZE
+                while True:
+                    start = max(0, len(mm) - tail_size)
+                    metadata = self._parse_tail(mm[start:])
+                    if (
+                        all(key in metadata for key in REQUIRED_METADATA) or
+                        start == 0 or
+                        tail_size >= GCODE_TAIL_MAX_SIZE
+                    ):
+                        return metadata
+                    tail_size *= 2
+
+    def read(self) -> DctGcodeStats:
+        metadata = self.read_metadata()
+        missing = [key for key in REQUIRED_METADATA if key not in metadata]
+        if missing:
+            raise Exception('Print statistics %s not found in %s' % (missing, self.gcode_file))
+        return DctGcodeStats(
+            print_time_sec=print_time_to_seconds(metadata[PRINT_TIME]),
+            silent_print_time_sec=(
+                print_time_to_seconds(metadata[SILENT_PRINT_TIME])
+                if SILENT_PRINT_TIME in metadata else None
+            ),
+            first_layer_print_time_sec=(
+                print_time_to_seconds(metadata[FIRST_LAYER_PRINT_TIME])
+                if FIRST_LAYER_PRINT_TIME in metadata else None
+            ),
+            filament_used_mm=_sum_values(metadata.get(FILAMENT_USED_MM, '0')),
+            filament_used_cm3=_sum_values(metadata.get(FILAMENT_USED_CM3, '0')),
+            filament_used_g=_sum_values(metadata.get(TOTAL_FILAMENT_USED_G, metadata[FILAMENT_USED_G])),
+            total_cost=_sum_values(metadata.get(TOTAL_FILAMENT_COST, metadata.get(FILAMENT_COST, '0'))),
+            total_layers=int(metadata[TOTAL_LAYERS]) if TOTAL_LAYERS in metadata else None,
+        )
+
+
+__all__ = [
+    'DctGcodeStats',
+    'PrusaGcodeMetadataReader',
+    'print_time_to_seconds',
+    'sum_gcode_stats',
+]
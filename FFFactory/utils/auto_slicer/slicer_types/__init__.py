@@ -5,7 +5,7 @@ from .slicer_options import (  # noqa: F401
     SelfClearingSlicerCommandsOptionsBase,
 )
 from .slicer_transform import SlicerTransformBase   # noqa: F401
-from .slicer_cmd_tools import SlicerCmdRunnerBase, SlicerCmdParserBase  # noqa: F401
+from .slicer_cmd_tools import SlicerCmdRunnerBase, SlicerAsyncCmdRunnerBase, SlicerCmdParserBase  # noqa: F401
 from .slicer_types import (  # noqa: F401
     FlagOptionType,
     XYOptionsType,
@@ -1,5 +1,5 @@
 from abc import ABC
-from typing import Optional, Any
+from typing import Awaitable, Optional, Any
 
 from .slicer_config import SlicerConfigBase
 
@@ -34,6 +34,24 @@ class SlicerActionsRunnerBase(ABC):
         """
         raise NotImplementedError()
 
+    def export_gcode_async(
+        self,
+        input_file: str,
+        output_dir: str,
+        timeout: Optional[float] = None
+    ) -> Awaitable[Any]:
+        """Method for exporting gcode from an event loop
+
+        The command line is built when the method is called, so the config
+        can be changed for the next call before the result is awaited.
+
+        :param input_file: input file
+        :param output_dir: output dir
+        :param timeout: seconds before the slicer is killed
+        :return: awaitable output file
+        """
+        raise NotImplementedError()
+
     def export_3mf(self, input_file: str, output_dir: str) -> Any:
         """Method for exporting 3mf
 
@@ -87,6 +105,15 @@ class SlicerActionsRunnerBase(ABC):
         """
         raise NotImplementedError()
 
+    def get_info_async(self, input_file: str, timeout: Optional[float] = None) -> Awaitable[Any]:
+        """Method for getting information about the input file from an event loop
+
+        :param input_file: input file
+        :param timeout: seconds before the slicer is killed
+        :return: awaitable information about the input file
+        """
+        raise NotImplementedError()
+
     def save_config_file(self, output_file: str) -> Any:
         """Method for saving config file
 
@@ -1,6 +1,9 @@
+import asyncio
+import os
+import signal
 import time
 from abc import ABC, abstractmethod
-from typing import Any
+from typing import Any, Optional
 
 from FFFactory.utils.systems_util import ExistsFileType
 
@@ -32,3 +35,82 @@ class SlicerCmdRunnerBase(ABC):
         perf_counter = time.perf_counter()
         result = self._run_cmd(cmd)
         return self.cmd_parser.parse(result, perf_counter, **kwargs)
+
+
+class SlicerAsyncCmdRunnerBase(SlicerCmdRunnerBase):
+    """Runs the slicer as a child process without a shell and streams its output.
+
+    Reading stops as soon as a line starting with ``_STOP_LINE`` shows up on stdout,
+    the slicer process group is killed on timeout or cancellation.
+    """
+    _STOP_LINE: Optional[str] = None
+
+    def __init__(
+        self,
+        slicer_path: ExistsFileType,
+        cmd_parser: SlicerCmdParserBase,
+        timeout: Optional[float] = None
+    ):
+        super().__init__(slicer_path, cmd_parser)
+        self._timeout = timeout
+        self._stderr = ''
+
+    @property
+    def timeout(self) -> Optional[float]:
+        return self._timeout
+
+    @property
+    def stderr(self) -> str:
+        return self._stderr
+
+    @abstractmethod
+    def _get_argv(self, cmd: list[str]) -> list[str]:
+        raise NotImplementedError()
+
+    @staticmethod
+    async def _read_lines(
+        stream: asyncio.StreamReader,
+        lines: list[str],
+        stop_line: Optional[str] = None
+    ) -> bool:
+        async for raw_line in stream:
+            line = raw_line.decode(errors='replace')
+            lines.append(line)
+            if stop_line is not None and line.startswith(stop_line):
+                return True
+        return False
+
+    async def _run_cmd_async(self, cmd: list[str], timeout: Optional[float] = None) -> str:
+        process = await asyncio.create_subprocess_exec(
+            *self._get_argv(cmd),
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            start_new_session=True
+        )
+        stdout_lines: list[str] = []
+        stderr_lines: list[str] = []
+        stdout_task = asyncio.ensure_future(self._read_lines(process.stdout, stdout_lines, self._STOP_LINE))
+        stderr_task = asyncio.ensure_future(self._read_lines(process.stderr, stderr_lines))
+        try:
+            async with asyncio.timeout(timeout):
+                stopped = await stdout_task
+                if not stopped:
+                    await stderr_task
+                    await process.wait()
+        finally:
+            for task in (stdout_task, stderr_task):
+                task.cancel()
+            if process.returncode is None:
+                # AppImage builds fork the real slicer, kill the whole group
+                os.killpg(process.pid, signal.SIGKILL)
+                await process.wait()
+            self._stderr = ''.join(stderr_lines)
+        return ''.join(stdout_lines)
+
+    def _run_cmd(self, cmd: list[str]) -> str:
+        return asyncio.run(self._run_cmd_async(cmd, self.timeout))
+
+    async def run_async(self, cmd: list[str], timeout: Optional[float] = None, **kwargs):
+        perf_counter = time.perf_counter()
+        result = await self._run_cmd_async(cmd, timeout if timeout is not None else self.timeout)
+        return self.cmd_parser.parse(result, perf_counter, **kwargs)
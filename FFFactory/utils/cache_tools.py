@@ -0,0 +1,183 @@
+import fcntl
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Any, Iterator, Optional, TypedDict
+
+from FFFactory.utils.systems_util import ExistsDirType
+
+
+HASH_CHUNK_SIZE = 1 << 20
+DEFAULT_MAX_SIZE_BYTES = 1 << 30
+TEMP_PREFIX = '.tmp_'
+LOCK_PREFIX = '.lock_'
+# Entries share 256 lock files instead of leaving one behind per entry
+LOCK_STRIPE_CHARS = 2
+
+
+@lru_cache(maxsize=1024)
+def _file_sha256(file_path: str, size: int, mtime_ns: int) -> str:
+    sha256 = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        while chunk := f.read(HASH_CHUNK_SIZE):
+            sha256.update(chunk)
+    return sha256.hexdigest()
+
+
+def file_sha256(file_path: str) -> str:
+    stat = os.stat(file_path)
+    return _file_sha256(os.path.abspath(file_path), stat.st_size, stat.st_mtime_ns)
+
+
+def link_file(src_path: str, dst_path: str) -> str:
+    """Hard links ``src_path`` to ``dst_path``, or copies it across file systems."""
+    fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(dst_path) or '.', prefix=TEMP_PREFIX)
+    os.close(fd)
+    os.remove(temp_path)
+    try:
+        os.link(src_path, temp_path)
+    except OSError:
+        shutil.copyfile(src_path, temp_path)
+    os.replace(temp_path, dst_path)
+    return dst_path
+
+
+class DctCacheStats(TypedDict):
+    hits: int
+    misses: int
+    entries: int
+    size_bytes: int
+
+
+class FileCache:
+    """Directory of cache entries evicted by least recent use.
+
+    Entries are published with ``os.replace`` so several processes can share
+    one directory, the modification time of an entry is its last use.
+    """
+
+    def __init__(self, cache_dir: ExistsDirType, max_size_bytes: int = DEFAULT_MAX_SIZE_BYTES):
+        self._cache_dir = cache_dir
+        self._max_size_bytes = max_size_bytes
+        self._hits = 0
+        self._misses = 0
+
+    @property
+    def cache_dir(self) -> str:
+        return self._cache_dir.value
+
+    @property
+    def max_size_bytes(self) -> int:
+        return self._max_size_bytes
+
+    def _get_entry_path(self, name: str) -> str:
+        return os.path.join(self.cache_dir, name)
+
+    def _scan_entries(self) -> list[tuple[int, int, str]]:
+        result: list[tuple[int, int, str]] = []
+        with os.scandir(self.cache_dir) as entries:
+            for entry in entries:
+                if entry.name.startswith((TEMP_PREFIX, LOCK_PREFIX)) or not entry.is_file():
+                    continue
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                result.append((stat.st_mtime_ns, stat.st_size, entry.path))
+        return result
+
+    def _evict(self) -> None:
+        entries = self._scan_entries()
+        size_bytes = sum(size for _, size, _ in entries)
+        if size_bytes <= self.max_size_bytes:
+            return
+        for _, size, path in sorted(entries):
+            if size_bytes <= self.max_size_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            size_bytes -= size
+
+    def _publish(self, name: str, write_func) -> str:
+        fd, temp_path = tempfile.mkstemp(dir=self.cache_dir, prefix=TEMP_PREFIX)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                write_func(f)
+            entry_path = self._get_entry_path(name)
+            os.replace(temp_path, entry_path)
+        except BaseException:
+            os.remove(temp_path)
+            raise
+        self._evict()
+        return entry_path
+
+    @contextmanager
+    def lock(self, name: str) -> Iterator[None]:
+        """Holds an exclusive lock shared by every process using the cache directory."""
+        stripe = hashlib.sha256(name.encode()).hexdigest()[:LOCK_STRIPE_CHARS]
+        with open(self._get_entry_path(LOCK_PREFIX + stripe), 'a') as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def get_path(self, name: str) -> Optional[str]:
+        entry_path = self._get_entry_path(name)
+        try:
+            os.utime(entry_path)
+        except FileNotFoundError:
+            self._misses += 1
+            return None
+        self._hits += 1
+        return entry_path
+
+    def get_bytes(self, name: str) -> Optional[bytes]:
+        entry_path = self.get_path(name)
+        if entry_path is None:
+            return None
+        try:
+            with open(entry_path, 'rb') as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def get_json(self, name: str) -> Optional[Any]:
+        data = self.get_bytes(name)
+        return json.loads(data) if data is not None else None
+
+    def put_bytes(self, name: str, data: bytes) -> str:
+        return self._publish(name, lambda f: f.write(data))
+
+    def put_json(self, name: str, value: Any) -> str:
+        return self.put_bytes(name, json.dumps(value, sort_keys=True).encode())
+
+    def put_file(self, name: str, file_path: str) -> str:
+        def copy(f) -> None:
+            with open(file_path, 'rb') as src:
+                shutil.copyfileobj(src, f)
+        return self._publish(name, copy)
+
+    @property
+    def stats(self) -> DctCacheStats:
+        entries = self._scan_entries()
+        return DctCacheStats(
+            hits=self._hits,
+            misses=self._misses,
+            entries=len(entries),
+            size_bytes=sum(size for _, size, _ in entries),
+        )
+
+
+__all__ = [
+    'DctCacheStats',
+    'FileCache',
+    'file_sha256',
+    'link_file',
+]
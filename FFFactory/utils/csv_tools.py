@@ -1,19 +1,32 @@
 import csv
+from abc import ABC, abstractmethod
 from io import TextIOWrapper
 from typing import Optional
 
 
-class CsvWriter:
-    def __init__(self, file_name: str, fieldnames: list[str]):
+class RowWriterBase(ABC):
+    @abstractmethod
+    def writerow(self, data: dict) -> None:
+        raise NotImplementedError()
+
+
+class CsvWriter(RowWriterBase):
+    def __init__(self, file_name: str, fieldnames: list[str], append: bool = False):
         self._file_name = file_name
         self._file: Optional[TextIOWrapper] = None
         self._fieldnames = fieldnames
+        self._append = append
         self._writer: Optional[csv.DictWriter] = None
 
+    @property
+    def append(self) -> bool:
+        return self._append
+
     def __enter__(self) -> 'CsvWriter':
-        self._file = open(self._file_name, 'w')
+        self._file = open(self._file_name, 'a' if self.append else 'w', newline='')
         self._writer = csv.DictWriter(self._file, fieldnames=self._fieldnames)
-        self._writer.writeheader()
+        if self._file.tell() == 0:
+            self._writer.writeheader()
         return self
 
     def __exit__(self, exc_type, exc_val, exc_tb):
@@ -22,3 +35,17 @@ class CsvWriter:
     def writerow(self, data: dict) -> None:
         if self._writer is not None:
             self._writer.writerow(data)
+            # Rows written before a crash stay on disk
+            self._file.flush()  # type: ignore
+
+
+class MemoryWriter(RowWriterBase):
+    def __init__(self):
+        self._rows: list[dict] = []
+
+    @property
+    def rows(self) -> list[dict]:
+        return self._rows
+
+    def writerow(self, data: dict) -> None:
+        self._rows.append(data)
@@ -1 +1 @@
-from .mesh_tools import MeshRepairer, MeshTweaker  # noqa: F401
+from .mesh_tools import MeshDecimator, MeshFastTweaker, MeshRepairer, MeshTweaker  # noqa: F401
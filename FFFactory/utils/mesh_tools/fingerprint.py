@@ -0,0 +1,97 @@
+import hashlib
+from typing import Optional
+
+import numpy as np
+
+from FFFactory.utils.cache_tools import FileCache, file_sha256
+from .indexed_mesh import IndexedMesh
+from .mesh_io import load_meshes
+
+
+FINGERPRINT_FORMAT = '1'
+# Millimeters, far below what a printer resolves and far above float32 noise
+FINGERPRINT_PRECISION = 0.001
+FINGERPRINT_CACHE_SUFFIX = '.fingerprint'
+FINGERPRINT_CACHE_SIZE = 1024
+
+_FINGERPRINT_CACHE: dict[str, str] = {}
+
+
+def _get_canonical_arrays(mesh: IndexedMesh, precision: float) -> tuple[np.ndarray, np.ndarray]:
+    """Quantizes and welds the vertices and puts vertices and faces in a canonical order.
+
+    :return: sorted unique grid vertices, sorted faces indexing them
+    """
+    keys = np.floor(mesh.vertices.astype(np.float64) / precision + 0.5).astype(np.int64)
+    vertices, inverse = np.unique(keys, axis=0, return_inverse=True)
+    faces = inverse.reshape(-1)[mesh.faces]
+    # Facets collapsed by the quantization have no area
+    faces = faces[(faces[:, 0] != faces[:, 1]) & (faces[:, 1] != faces[:, 2]) & (faces[:, 2] != faces[:, 0])]
+    # Rotating a facet to start at its lowest vertex keeps its winding
+    first = np.argmin(faces, axis=1)
+    faces = faces[np.arange(len(faces))[:, None], (first[:, None] + np.arange(3)) % 3]
+    if len(faces):
+        faces = np.unique(faces, axis=0)
+    return vertices, faces
+
+
+def _get_moments(vertices: np.ndarray, faces: np.ndarray) -> np.ndarray:
+    """Volume, area and principal second moments about the centroid."""
+    triangles = vertices[faces]
+    cross = np.cross(triangles[:, 1] - triangles[:, 0], triangles[:, 2] - triangles[:, 0])
+    area = np.linalg.norm(cross, axis=1).sum() / 2.0
+    signed = np.einsum('ij,ij->i', triangles[:, 0], np.cross(triangles[:, 1], triangles[:, 2])) / 6.0
+    volume = signed.sum()
+    if volume == 0:
+        return np.array([0.0, area, 0.0, 0.0, 0.0])
+    # Every facet spans a tetrahedron with the origin
+    centroid = (signed[:, None] * triangles.sum(axis=1)).sum(axis=0) / 4.0 / volume
+    corners = np.concatenate([np.zeros((len(triangles), 1, 3)), triangles], axis=1) - centroid
+    sums = corners.sum(axis=1)
+    second = (
+        np.einsum('f,fai,faj->ij', signed, corners, corners) + np.einsum('f,fi,fj->ij', signed, sums, sums)
+    ) / 20.0
+    return np.concatenate([[abs(volume), area], np.sort(np.abs(np.linalg.eigvalsh(second)))])
+
+
+def get_mesh_fingerprint(mesh: IndexedMesh, precision: float = FINGERPRINT_PRECISION) -> str:
+    """Hashes the geometry of a mesh whatever its file format, facet order or vertex order.
+
+    Vertices closer than ``precision`` to the same grid point are the same
+    vertex, so re-exported copies of a model share their fingerprint.
+    """
+    vertices, faces = _get_canonical_arrays(mesh, precision)
+    moments = _get_moments(vertices * precision, faces)
+    sha256 = hashlib.sha256()
+    sha256.update(('%s:%r:%d:%d:' % (FINGERPRINT_FORMAT, precision, len(vertices), len(faces))).encode())
+    sha256.update(' '.join('%.9e' % moment for moment in moments).encode())
+    sha256.update(np.ascontiguousarray(vertices).tobytes())
+    sha256.update(np.ascontiguousarray(faces, dtype=np.int64).tobytes())
+    return sha256.hexdigest()
+
+
+def get_file_fingerprint(file_path: str, cache: Optional[FileCache] = None) -> str:
+    """Returns the fingerprint of every part of a mesh file, remembered by file content."""
+    content_hash = file_sha256(file_path)
+    fingerprint = _FINGERPRINT_CACHE.get(content_hash)
+    if fingerprint is not None:
+        return fingerprint
+    cache_name = content_hash + FINGERPRINT_CACHE_SUFFIX
+    cached = cache.get_json(cache_name) if cache is not None else None
+    if cached is not None and cached.get('format') == FINGERPRINT_FORMAT:
+        fingerprint = cached['fingerprint']
+    else:
+        fingerprint = get_mesh_fingerprint(IndexedMesh.concatenate(load_meshes(file_path)))
+        if cache is not None:
+            cache.put_json(cache_name, {'format': FINGERPRINT_FORMAT, 'fingerprint': fingerprint})
+    if len(_FINGERPRINT_CACHE) >= FINGERPRINT_CACHE_SIZE:
+        _FINGERPRINT_CACHE.pop(next(iter(_FINGERPRINT_CACHE)))
+    _FINGERPRINT_CACHE[content_hash] = fingerprint
+    return fingerprint
+
+
+__all__ = [
+    'FINGERPRINT_PRECISION',
+    'get_file_fingerprint',
+    'get_mesh_fingerprint',
+]
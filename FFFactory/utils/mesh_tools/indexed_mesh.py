@@ -0,0 +1,215 @@
+from functools import cached_property
+from typing import Optional, Sequence
+
+import numpy as np
+
+
+DEFAULT_WELD_TOLERANCE = 0.0
+
+
+def get_unique_rows(keys: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Like ``np.unique(keys, axis=0)`` with a column-wise sort, several times faster on large arrays.
+
+    :return: index of the first row of every unique row in sorted order, unique row of every row
+    """
+    order = np.lexsort(keys.T[::-1])
+    ordered = keys[order]
+    is_new = np.ones(len(keys), dtype=bool)
+    is_new[1:] = np.any(ordered[1:] != ordered[:-1], axis=1)
+    inverse = np.empty(len(keys), dtype=np.int64)
+    inverse[order] = np.cumsum(is_new) - 1
+    return order[is_new], inverse
+
+
+def weld_vertices(points: np.ndarray, tolerance: float = DEFAULT_WELD_TOLERANCE) -> tuple[np.ndarray, np.ndarray]:
+    """Merges points closer than ``tolerance``, exact duplicates only when it is 0.
+
+    Points are snapped to a grid of ``tolerance`` cells, the first point of a
+    cell is kept.
+
+    :return: unique vertices, index of the unique vertex of every point
+    """
+    points = np.asarray(points).reshape(-1, 3)
+    if tolerance > 0:
+        keys = np.floor(points / tolerance + 0.5).astype(np.int64)
+    else:
+        # Adding zero turns -0.0 into 0.0
+        keys = points.astype(np.float32) + np.float32(0.0)
+    first, inverse = get_unique_rows(keys)
+    return points[first].astype(np.float32), inverse.astype(np.int32)
+
+
+def get_connected_components(edges: np.ndarray, n_nodes: int) -> np.ndarray:
+    """Labels every node of a graph with the smallest node index of its component."""
+    parent = np.arange(n_nodes)
+    while True:
+        roots_a = parent[edges[:, 0]]
+        roots_b = parent[edges[:, 1]]
+        low = np.minimum(roots_a, roots_b)
+        high = np.maximum(roots_a, roots_b)
+        linked = low != high
+        if not linked.any():
+            return parent
+        np.minimum.at(parent, high[linked], low[linked])
+        while True:
+            jumped = parent[parent]
+            if np.array_equal(jumped, parent):
+                break
+            parent = jumped
+
+
+class IndexedMesh:
+    """Triangle mesh of unique float32 vertices and int32 faces indexing them.
+
+    Topology (edges, manifold status, components) is computed on first use
+    and kept, the arrays must not be modified in place.
+    """
+
+    def __init__(self, vertices: np.ndarray, faces: np.ndarray):
+        self._vertices = np.ascontiguousarray(vertices, dtype=np.float32).reshape(-1, 3)
+        self._faces = np.ascontiguousarray(faces, dtype=np.int32).reshape(-1, 3)
+
+    @classmethod
+    def from_triangles(cls, triangles: np.ndarray, tolerance: float = DEFAULT_WELD_TOLERANCE) -> 'IndexedMesh':
+        vertices, faces = weld_vertices(triangles, tolerance)
+        return cls(vertices, faces)
+
+    @classmethod
+    def concatenate(cls, meshes: Sequence['IndexedMesh']) -> 'IndexedMesh':
+        if not meshes:
+            return cls(np.zeros((0, 3)), np.zeros((0, 3)))
+        offsets = np.cumsum([0] + [len(mesh.vertices) for mesh in meshes])
+        return cls(
+            np.concatenate([mesh.vertices for mesh in meshes]),
+            np.concatenate([mesh.faces + offset for mesh, offset in zip(meshes, offsets)]),
+        )
+
+    @property
+    def vertices(self) -> np.ndarray:
+        return self._vertices
+
+    @property
+    def faces(self) -> np.ndarray:
+        return self._faces
+
+    @property
+    def triangles(self) -> np.ndarray:
+        return self.vertices[self.faces]
+
+    def weld(self, tolerance: float = DEFAULT_WELD_TOLERANCE) -> 'IndexedMesh':
+        vertices, index = weld_vertices(self.vertices, tolerance)
+        return IndexedMesh(vertices, index[self.faces])
+
+    def transform(self, matrix: np.ndarray, translation: Optional[np.ndarray] = None) -> 'IndexedMesh':
+        """Applies ``vertices @ matrix + translation``, the faces are shared."""
+        vertices = self.vertices.astype(np.float64) @ np.asarray(matrix, dtype=np.float64)
+        if translation is not None:
+            vertices += translation
+        return IndexedMesh(vertices, self.faces)
+
+    def get_bounds(self) -> tuple[np.ndarray, np.ndarray]:
+        if not len(self.vertices):
+            return np.zeros(3), np.zeros(3)
+        return self.vertices.min(axis=0).astype(np.float64), self.vertices.max(axis=0).astype(np.float64)
+
+    @cached_property
+    def face_normals(self) -> np.ndarray:
+        """Unnormalized normals from the winding, their length is twice the facet area."""
+        triangles = self.triangles.astype(np.float64)
+        return np.cross(triangles[:, 1] - triangles[:, 0], triangles[:, 2] - triangles[:, 0])
+
+    @cached_property
+    def volume(self) -> float:
+        triangles = self.triangles.astype(np.float64)
+        return abs(float(np.einsum('ij,ij->', triangles[:, 0], np.cross(triangles[:, 1], triangles[:, 2])))) / 6.0
+
+    @cached_property
+    def _edges(self) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """:return: directed edges, undirected edge of every directed edge, edge order, faces per edge"""
+        directed = self.faces[:, [0, 1, 1, 2, 2, 0]].reshape(-1, 2).astype(np.int64)
+        undirected = np.sort(directed, axis=1)
+        keys = undirected[:, 0] * max(len(self.vertices), 1) + undirected[:, 1]
+        order = np.argsort(keys, kind='stable')
+        _, inverse, counts = np.unique(keys[order], return_inverse=True, return_counts=True)
+        edge_of = np.empty(len(keys), dtype=np.int64)
+        edge_of[order] = inverse
+        return directed, edge_of, order, counts
+
+    @property
+    def edge_face_counts(self) -> np.ndarray:
+        return self._edges[3]
+
+    @property
+    def face_edges(self) -> np.ndarray:
+        """Undirected edge index of the three edges of every face."""
+        return self._edges[1].reshape(-1, 3)
+
+    @cached_property
+    def _shared_edges(self) -> tuple[np.ndarray, np.ndarray]:
+        """:return: positions in the directed edges of the two uses of every edge of exactly two faces"""
+        _, _, order, counts = self._edges
+        starts = np.concatenate([[0], np.cumsum(counts)[:-1]]).astype(np.int64)
+        shared = starts[counts == 2]
+        return order[shared], order[shared + 1]
+
+    @cached_property
+    def face_pairs(self) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """:return: the two faces of every edge of exactly two faces, whether both run the edge the same way"""
+        directed = self._edges[0]
+        first, second = self._shared_edges
+        return first // 3, second // 3, directed[first, 0] == directed[second, 0]
+
+    @cached_property
+    def face_neighbors(self) -> np.ndarray:
+        """Face across each of the three edges of every face, -1 unless exactly two faces share the edge."""
+        first, second = self._shared_edges
+        result = np.full(len(self.faces) * 3, -1, dtype=np.int64)
+        result[first] = second // 3
+        result[second] = first // 3
+        return result.reshape(-1, 3)
+
+    @cached_property
+    def open_edges(self) -> int:
+        return int(np.count_nonzero(self.edge_face_counts == 1))
+
+    @cached_property
+    def backwards_edges(self) -> int:
+        # Two facets sharing an edge in the same direction disagree on orientation
+        return int(np.count_nonzero(self.face_pairs[2]))
+
+    @cached_property
+    def is_manifold(self) -> bool:
+        return bool(np.all(self.edge_face_counts == 2)) and self.backwards_edges == 0
+
+    @cached_property
+    def vertex_components(self) -> np.ndarray:
+        return get_connected_components(self.faces[:, [0, 1, 1, 2]].reshape(-1, 2), len(self.vertices))
+
+    @cached_property
+    def face_components(self) -> np.ndarray:
+        """Component of every face numbered from 0."""
+        _, labels = np.unique(self.vertex_components[self.faces[:, 0]], return_inverse=True)
+        return labels.reshape(-1)
+
+    @property
+    def number_of_components(self) -> int:
+        return int(self.face_components.max()) + 1 if len(self.faces) else 0
+
+    def select_faces(self, selection: np.ndarray) -> 'IndexedMesh':
+        """Mesh of the selected faces, a mask or indexes, without the vertices they do not use."""
+        faces = self.faces[selection]
+        used, local_faces = np.unique(faces, return_inverse=True)
+        return IndexedMesh(self.vertices[used], local_faces.reshape(-1, 3))
+
+    def split(self) -> list['IndexedMesh']:
+        order = np.argsort(self.face_components, kind='stable')
+        bounds = np.searchsorted(self.face_components[order], np.arange(self.number_of_components + 1))
+        return [self.select_faces(order[start:stop]) for start, stop in zip(bounds[:-1], bounds[1:])]
+
+
+__all__ = [
+    'DEFAULT_WELD_TOLERANCE',
+    'IndexedMesh',
+    'get_unique_rows',
+    'weld_vertices',
+]
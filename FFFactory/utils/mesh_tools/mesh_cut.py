@@ -0,0 +1,88 @@
+from typing import Sequence
+
+import numpy as np
+
+from .indexed_mesh import IndexedMesh
+from .mesh_repair import remove_degenerate_faces
+
+
+# Share of the bed left free around every part
+CUT_MARGIN = 0.02
+
+
+def _interpolate(first: np.ndarray, second: np.ndarray, axis: int, value: float) -> np.ndarray:
+    # Both faces of an edge interpolate from its lower end, so they get the same point
+    swap = first[:, axis] > second[:, axis]
+    low = np.where(swap[:, None], second, first)
+    high = np.where(swap[:, None], first, second)
+    t = (value - low[:, axis]) / (high[:, axis] - low[:, axis])
+    points = low + t[:, None] * (high - low)
+    points[:, axis] = value
+    return points
+
+
+def _roll(triangles: np.ndarray, first: np.ndarray) -> np.ndarray:
+    """Turns every triangle to start at its corner ``first``, the winding is kept."""
+    index = (first[:, None] + np.arange(3)) % 3
+    return np.take_along_axis(triangles, index[:, :, None], axis=1)
+
+
+def clip_triangles(triangles: np.ndarray, axis: int, value: float, keep_below: bool) -> np.ndarray:
+    """Keeps the part of every triangle on one side of the plane ``x[axis] = value``.
+
+    The cut is left open, slicers close it with their repair.
+    """
+    coordinates = triangles[:, :, axis]
+    inside = coordinates <= value if keep_below else coordinates >= value
+    counts = inside.sum(axis=1)
+    result = [triangles[counts == 3]]
+
+    # One corner inside: the triangle shrinks towards it
+    one = triangles[counts == 1]
+    if len(one):
+        one = _roll(one, np.argmax(inside[counts == 1], axis=1))
+        result.append(np.stack([
+            one[:, 0],
+            _interpolate(one[:, 0], one[:, 1], axis, value),
+            _interpolate(one[:, 0], one[:, 2], axis, value),
+        ], axis=1))
+
+    # Two corners inside: the quad left after the outside corner is split in two
+    two = triangles[counts == 2]
+    if len(two):
+        two = _roll(two, np.argmin(inside[counts == 2], axis=1))
+        first = _interpolate(two[:, 0], two[:, 1], axis, value)
+        last = _interpolate(two[:, 2], two[:, 0], axis, value)
+        result.append(np.stack([first, two[:, 1], two[:, 2]], axis=1))
+        result.append(np.stack([first, two[:, 2], last], axis=1))
+    return np.concatenate(result)
+
+
+def get_cut_counts(size_xyz: Sequence[float], max_size_xyz: Sequence[float], margin: float = CUT_MARGIN) -> np.ndarray:
+    """Parts along every axis so each part fits ``max_size_xyz`` less the margin."""
+    usable = np.asarray(max_size_xyz, dtype=np.float64) * (1.0 - margin)
+    return np.maximum(1, np.ceil(np.asarray(size_xyz, dtype=np.float64) / usable)).astype(int)
+
+
+def cut_mesh(mesh: IndexedMesh, counts: Sequence[int]) -> list[IndexedMesh]:
+    """Cuts the mesh into a grid of ``counts`` equal boxes along X, Y and Z, empty boxes are dropped."""
+    min_xyz, max_xyz = mesh.get_bounds()
+    parts = [mesh.triangles.astype(np.float64)]
+    for axis, count in enumerate(counts):
+        cuts = np.linspace(min_xyz[axis], max_xyz[axis], int(count) + 1)[1:-1]
+        slabs = []
+        for triangles in parts:
+            for value in cuts:
+                slabs.append(clip_triangles(triangles, axis, value, keep_below=True))
+                triangles = clip_triangles(triangles, axis, value, keep_below=False)
+            slabs.append(triangles)
+        parts = [slab for slab in slabs if len(slab)]
+    # Faces touching a cut plane leave slivers on its other side
+    return [remove_degenerate_faces(IndexedMesh.from_triangles(triangles)) for triangles in parts]
+
+
+__all__ = [
+    'clip_triangles',
+    'cut_mesh',
+    'get_cut_counts',
+]
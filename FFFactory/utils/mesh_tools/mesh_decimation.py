@@ -0,0 +1,142 @@
+from typing import Optional, TypedDict
+
+import numpy as np
+
+from .indexed_mesh import IndexedMesh, get_unique_rows
+from .mesh_repair import remove_degenerate_faces, remove_duplicate_faces
+
+
+DEFAULT_TARGET_FACES = 500_000
+# Cell size corrections before settling for the closest count under the target
+SEARCH_STEPS = 6
+# Accepted share of the target, a count between it and the target ends the search
+TARGET_TOLERANCE = 0.85
+# Pull towards the mean of a cell, keeps flat and ridge cells solvable
+REGULARIZATION = 1e-3
+
+
+class DctDecimationDrift(TypedDict):
+    faces_before: int
+    faces_after: int
+    volume_before: float
+    volume_after: float
+    volume_drift: float
+    bbox_drift: float
+
+
+def _sum_onto_corners(corner_clusters: np.ndarray, values: np.ndarray, n_clusters: int) -> np.ndarray:
+    """Adds a value of every face to the clusters of its three corners."""
+    return sum(np.bincount(corner_clusters[:, k], weights=values, minlength=n_clusters) for k in range(3))
+
+
+def cluster_vertices(mesh: IndexedMesh, cell_size: float) -> IndexedMesh:
+    """Merges the vertices of every grid cell into the point of least quadric error.
+
+    Each face adds the area-weighted quadric of its plane to the cells of its
+    corners, the merged vertex minimizes the summed squared distances to
+    those planes and stays inside its cell.
+    """
+    vertices = mesh.vertices.astype(np.float64)
+    origin = vertices.min(axis=0)
+    cells = np.floor((vertices - origin) / cell_size).astype(np.int64)
+    first, cluster = get_unique_rows(cells)
+    n_clusters = len(first)
+
+    normals = mesh.face_normals
+    lengths = np.linalg.norm(normals, axis=1)
+    unit = np.divide(normals, lengths[:, None], out=np.zeros_like(normals), where=lengths[:, None] > 0)
+    weights = lengths / 2.0
+    offsets = -np.einsum('ij,ij->i', unit, vertices[mesh.faces[:, 0]])
+    corner_clusters = cluster[mesh.faces]
+    # One component at a time, a full quadric per face does not fit large scans
+    quadric_a = np.empty((n_clusters, 3, 3))
+    for i in range(3):
+        for j in range(i, 3):
+            quadric_a[:, i, j] = quadric_a[:, j, i] = _sum_onto_corners(
+                corner_clusters, weights * unit[:, i] * unit[:, j], n_clusters
+            )
+    quadric_b = np.stack([
+        _sum_onto_corners(corner_clusters, weights * offsets * unit[:, i], n_clusters) for i in range(3)
+    ], axis=1)
+
+    counts = np.bincount(cluster, minlength=n_clusters)
+    means = np.stack([np.bincount(cluster, weights=vertices[:, i], minlength=n_clusters) for i in range(3)], axis=1)
+    means /= counts[:, None]
+    scale = REGULARIZATION * (np.trace(quadric_a, axis1=1, axis2=2) / 3.0 + 1e-12)
+    system = quadric_a + scale[:, None, None] * np.identity(3)
+    positions = np.linalg.solve(system, (-quadric_b + scale[:, None] * means)[:, :, None])[:, :, 0]
+    low = origin + cells[first] * cell_size
+    positions = np.clip(positions, low, low + cell_size)
+
+    clustered = IndexedMesh(positions, corner_clusters)
+    return remove_duplicate_faces(remove_degenerate_faces(clustered))
+
+
+def _get_cell_size(mesh: IndexedMesh, target_faces: int) -> float:
+    # A surface of area S crossed by cells of size h has about 2 S / h^2 faces
+    area = float(np.linalg.norm(mesh.face_normals, axis=1).sum() / 2.0)
+    return float(np.sqrt(2.0 * area / max(target_faces, 1)))
+
+
+def decimate_mesh(
+    mesh: IndexedMesh,
+    target_faces: Optional[int] = DEFAULT_TARGET_FACES,
+    max_error: Optional[float] = None
+) -> IndexedMesh:
+    """Simplifies the mesh to at most ``target_faces`` moving no vertex further than ``max_error``.
+
+    Either bound may be None, the mesh is returned as it is when it already
+    meets the target and no error bound asks for more.
+    """
+    if target_faces is None and max_error is None:
+        raise ValueError('Decimation needs a target facet count or an error bound')
+    # A vertex moves at most the diagonal of its cell
+    error_cell = max_error / np.sqrt(3.0) if max_error is not None else np.inf
+    if target_faces is None:
+        return cluster_vertices(mesh, error_cell)
+    if len(mesh.faces) <= target_faces:
+        return mesh if max_error is None else cluster_vertices(mesh, error_cell)
+
+    cell_size = min(_get_cell_size(mesh, target_faces), error_cell)
+    best: Optional[IndexedMesh] = None
+    for _ in range(SEARCH_STEPS):
+        decimated = cluster_vertices(mesh, cell_size)
+        n_faces = len(decimated.faces)
+        if n_faces <= target_faces and (best is None or n_faces > len(best.faces)):
+            best = decimated
+        if TARGET_TOLERANCE * target_faces <= n_faces <= target_faces:
+            break
+        if n_faces > target_faces and cell_size >= error_cell:
+            # The error bound allows no coarser grid
+            break
+        cell_size = min(cell_size * np.sqrt(max(n_faces, 1) / target_faces), error_cell)
+    return best if best is not None else decimated
+
+
+def get_drift(before: IndexedMesh, after: IndexedMesh) -> DctDecimationDrift:
+    min_before, max_before = before.get_bounds()
+    min_after, max_after = after.get_bounds()
+    return DctDecimationDrift(
+        faces_before=len(before.faces),
+        faces_after=len(after.faces),
+        volume_before=before.volume,
+        volume_after=after.volume,
+        volume_drift=abs(after.volume - before.volume) / before.volume if before.volume else 0.0,
+        bbox_drift=float(max(np.abs(min_after - min_before).max(), np.abs(max_after - max_before).max())),
+    )
+
+
+def format_drift(drift: DctDecimationDrift) -> str:
+    return '%d -> %d facets, volume %.2f%%, bounding box %.3f mm' % (
+        drift['faces_before'], drift['faces_after'], drift['volume_drift'] * 100, drift['bbox_drift']
+    )
+
+
+__all__ = [
+    'DEFAULT_TARGET_FACES',
+    'DctDecimationDrift',
+    'cluster_vertices',
+    'decimate_mesh',
+    'format_drift',
+    'get_drift',
+]
@@ -0,0 +1,84 @@
+import os
+from typing import Callable, Optional
+
+import numpy as np
+
+from FFFactory.utils.cache_tools import file_sha256
+from .indexed_mesh import IndexedMesh
+from .mesh_types import DctInfoAboutModel
+from .obj_reader import load_obj_meshes
+from .stl_reader import load_stl
+from .threemf_reader import load_3mf_meshes
+
+
+# Readers of the formats without facet normals, STL is read by load_stl
+MESH_LOADERS: dict[str, Callable[[str], list[IndexedMesh]]] = {
+    '.3mf': load_3mf_meshes,
+    '.obj': load_obj_meshes,
+}
+NATIVE_INFO_FILE_TYPES = ('.stl', *MESH_LOADERS)
+MESH_INFO_CACHE_SIZE = 1024
+
+_MESH_INFO_CACHE: dict[str, DctInfoAboutModel] = {}
+
+
+def _load_mesh(file_path: str) -> tuple[IndexedMesh, Optional[np.ndarray]]:
+    """Returns the welded mesh of a file and the facet normals stored in it."""
+    loader = MESH_LOADERS.get(os.path.splitext(file_path)[1].lower())
+    if loader is not None:
+        return IndexedMesh.concatenate(loader(file_path)).weld(), None
+    facets = load_stl(file_path)
+    return IndexedMesh.from_triangles(facets['vectors']), facets['normals']
+
+
+def _compute_mesh_info(file_path: str) -> DctInfoAboutModel:
+    mesh, normals = _load_mesh(file_path)
+    min_xyz, max_xyz = mesh.get_bounds()
+    size_xyz = max_xyz - min_xyz
+    facets_reversed = 0
+    if normals is not None:
+        # Without stored normals the winding is the orientation
+        facets_reversed = int(np.count_nonzero(
+            np.einsum('ij,ij->i', mesh.face_normals, normals.astype(np.float64)) < 0
+        ))
+
+    return DctInfoAboutModel(
+        file_name=os.path.basename(file_path),
+        size_x=float(size_xyz[0]),
+        size_y=float(size_xyz[1]),
+        size_z=float(size_xyz[2]),
+        min_x=float(min_xyz[0]),
+        min_y=float(min_xyz[1]),
+        min_z=float(min_xyz[2]),
+        max_x=float(max_xyz[0]),
+        max_y=float(max_xyz[1]),
+        max_z=float(max_xyz[2]),
+        number_of_facets=len(mesh.faces),
+        manifold=mesh.is_manifold,
+        open_edges=mesh.open_edges,
+        facets_reversed=facets_reversed,
+        backwards_edges=mesh.backwards_edges,
+        number_of_parts=mesh.number_of_components,
+        volume=mesh.volume,
+    )
+
+
+def is_native_info_supported(file_path: str) -> bool:
+    return os.path.splitext(file_path)[1].lower() in NATIVE_INFO_FILE_TYPES
+
+
+def get_mesh_info(file_path: str) -> DctInfoAboutModel:
+    content_hash = file_sha256(file_path)
+    mesh_info = _MESH_INFO_CACHE.get(content_hash)
+    if mesh_info is None:
+        mesh_info = _compute_mesh_info(file_path)
+        if len(_MESH_INFO_CACHE) >= MESH_INFO_CACHE_SIZE:
+            _MESH_INFO_CACHE.pop(next(iter(_MESH_INFO_CACHE)))
+        _MESH_INFO_CACHE[content_hash] = mesh_info
+    return DctInfoAboutModel(mesh_info, file_name=os.path.basename(file_path))  # type: ignore
+
+
+__all__ = [
+    'get_mesh_info',
+    'is_native_info_supported',
+]
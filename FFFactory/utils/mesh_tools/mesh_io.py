@@ -0,0 +1,36 @@
+import os
+
+import numpy as np
+
+from .indexed_mesh import IndexedMesh
+from .mesh_info import MESH_LOADERS
+from .stl_reader import load_stl, write_stl
+from .tweaker import FileHandler
+
+
+STL_FILE_TYPES = ('.stl',)
+
+
+def load_meshes(file_path: str) -> list[IndexedMesh]:
+    file_type = os.path.splitext(file_path)[1].lower()
+    if file_type in STL_FILE_TYPES:
+        return [IndexedMesh.from_triangles(load_stl(file_path)['vectors'])]
+    if file_type in MESH_LOADERS:
+        return MESH_LOADERS[file_type](file_path)
+    # Every part of any other file is a flat list of triangle corners
+    loaded_mesh = FileHandler().load_mesh(file_path)
+    return [
+        IndexedMesh.from_triangles(np.asarray(content['mesh']).reshape(-1, 3, 3))
+        for content in loaded_mesh.values()
+    ]
+
+
+def save_meshes(parts: list[IndexedMesh], output_file: str) -> str:
+    """Writes every part into one binary STL file."""
+    return write_stl(output_file, IndexedMesh.concatenate(parts).triangles)
+
+
+__all__ = [
+    'load_meshes',
+    'save_meshes',
+]
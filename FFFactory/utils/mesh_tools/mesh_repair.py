@@ -0,0 +1,160 @@
+import multiprocessing
+import os
+import resource
+from multiprocessing.connection import Connection
+from typing import Optional
+
+import numpy as np
+from pymeshfix import PyTMesh
+
+from .indexed_mesh import IndexedMesh, get_connected_components, get_unique_rows
+
+
+# Shells smaller than this share of the whole surface are scan debris
+SMALL_SHELL_AREA_RATIO = 1e-4
+# Fewer facets cannot enclose a volume
+MIN_SHELL_FACES = 4
+DEGENERATE_AREA = 1e-12
+
+DEFAULT_REPAIR_TIMEOUT = 300.0
+# Address space the repair may map on top of what the forked worker already has
+DEFAULT_REPAIR_MEMORY_LIMIT = 4 << 30
+
+
+def _get_doubled_areas(mesh: IndexedMesh) -> np.ndarray:
+    return np.linalg.norm(mesh.face_normals, axis=1)
+
+
+def remove_degenerate_faces(mesh: IndexedMesh) -> IndexedMesh:
+    faces = mesh.faces
+    repeated = (faces[:, 0] == faces[:, 1]) | (faces[:, 1] == faces[:, 2]) | (faces[:, 2] == faces[:, 0])
+    keep = ~repeated & (_get_doubled_areas(mesh) > 2.0 * DEGENERATE_AREA)
+    return mesh if keep.all() else mesh.select_faces(keep)
+
+
+def remove_duplicate_faces(mesh: IndexedMesh) -> IndexedMesh:
+    """Keeps the first of the faces on the same three vertices, whatever their winding."""
+    if not len(mesh.faces):
+        return mesh
+    first, _ = get_unique_rows(np.sort(mesh.faces, axis=1))
+    return mesh if len(first) == len(mesh.faces) else mesh.select_faces(np.sort(first))
+
+
+def remove_small_shells(mesh: IndexedMesh, area_ratio: float = SMALL_SHELL_AREA_RATIO) -> IndexedMesh:
+    if not len(mesh.faces):
+        return mesh
+    components = mesh.face_components
+    areas = np.bincount(components, weights=_get_doubled_areas(mesh))
+    counts = np.bincount(components)
+    small = (counts < MIN_SHELL_FACES) | (areas < area_ratio * areas.sum())
+    # The largest shell stays whatever the thresholds say
+    small[np.argmax(areas)] = False
+    return mesh if not small.any() else mesh.select_faces(~small[components])
+
+
+def orient_faces(mesh: IndexedMesh) -> IndexedMesh:
+    """Makes the winding of every shell consistent and its normals point outwards.
+
+    Face ``f`` as it is and face ``f`` flipped are two nodes of a graph
+    linking each face to its neighbors in the state that agrees with them.
+    A face is flipped when its flipped node joins the lower labelled half
+    of its shell. Shells that cannot be oriented keep their faces as they are.
+    """
+    n_faces = len(mesh.faces)
+    if not n_faces:
+        return mesh
+    first, second, same = mesh.face_pairs
+    edges = np.concatenate([
+        np.stack([first, np.where(same, second + n_faces, second)], axis=1),
+        np.stack([first + n_faces, np.where(same, second, second + n_faces)], axis=1),
+    ])
+    labels = get_connected_components(edges, 2 * n_faces)
+    flipped = labels[n_faces:] < labels[:n_faces]
+    faces = np.where(flipped[:, None], mesh.faces[:, ::-1], mesh.faces)
+
+    oriented = IndexedMesh(mesh.vertices, faces)
+    triangles = oriented.triangles.astype(np.float64)
+    signed = np.einsum('ij,ij->i', triangles[:, 0], np.cross(triangles[:, 1], triangles[:, 2]))
+    inside_out = np.bincount(oriented.face_components, weights=signed) < 0
+    if not inside_out.any():
+        return oriented
+    return IndexedMesh(mesh.vertices, np.where(inside_out[oriented.face_components][:, None], faces[:, ::-1], faces))
+
+
+def fast_repair(mesh: IndexedMesh) -> IndexedMesh:
+    """Fixes the cheap defects: unwelded, degenerate and duplicate facets, debris shells, reversed facets."""
+    mesh = remove_degenerate_faces(mesh.weld())
+    mesh = remove_duplicate_faces(mesh)
+    mesh = remove_small_shells(mesh)
+    return orient_faces(mesh)
+
+
+def _limit_memory(memory_limit: int) -> None:
+    try:
+        with open('/proc/self/statm') as f:
+            mapped = int(f.read().split()[0]) * os.sysconf('SC_PAGE_SIZE')
+    except OSError:
+        mapped = 0
+    resource.setrlimit(resource.RLIMIT_AS, (mapped + memory_limit, mapped + memory_limit))
+
+
+def _pymeshfix_repair(
+    vertices: np.ndarray,
+    faces: np.ndarray,
+    memory_limit: Optional[int],
+    connection: Connection
+) -> None:
+    try:
+        if memory_limit is not None:
+            _limit_memory(memory_limit)
+        tin = PyTMesh(False)  # verbose = False
+        tin.load_array(vertices.astype(np.float64), faces.astype(np.int32))
+        tin.fill_small_boundaries()
+        tin.remove_smallest_components()
+        connection.send(tin.return_arrays())
+    finally:
+        connection.close()
+
+
+def pymeshfix_repair(
+    mesh: IndexedMesh,
+    timeout: Optional[float] = DEFAULT_REPAIR_TIMEOUT,
+    memory_limit: Optional[int] = DEFAULT_REPAIR_MEMORY_LIMIT
+) -> Optional[IndexedMesh]:
+    """Repairs the mesh with pymeshfix in a child process.
+
+    :return: the repaired mesh, None when the child ran out of time or memory
+    """
+    receiver, sender = multiprocessing.Pipe(duplex=False)
+    process = multiprocessing.Process(
+        target=_pymeshfix_repair,
+        args=(mesh.vertices, mesh.faces, memory_limit, sender),
+        daemon=True
+    )
+    process.start()
+    sender.close()
+    try:
+        if not receiver.poll(timeout):
+            return None
+        try:
+            vertices, faces = receiver.recv()
+        except EOFError:
+            # The child died, e.g. on an allocation over the memory limit
+            return None
+        return IndexedMesh(vertices, faces)
+    finally:
+        process.kill()
+        process.join()
+        receiver.close()
+
+
+__all__ = [
+    'DEFAULT_REPAIR_MEMORY_LIMIT',
+    'DEFAULT_REPAIR_TIMEOUT',
+    'fast_repair',
+    'orient_faces',
+    'pymeshfix_repair',
+    'remove_degenerate_faces',
+    'remove_duplicate_faces',
+    'remove_small_shells',
+]
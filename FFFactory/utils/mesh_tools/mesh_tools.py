@@ -1,61 +1,299 @@
-import glob
-from typing import Type
-from pymeshfix import PyTMesh
+import multiprocessing
+import time
+from collections import deque
+from multiprocessing.connection import Connection, wait
+from multiprocessing.shared_memory import SharedMemory
+from typing import Callable, Optional, Type
 
-from FFFactory.utils.systems_util import ExistsFileType
+import numpy as np
 
+from FFFactory.utils.cache_tools import FileCache
+from FFFactory.utils.systems_util import ExistsFileType
+from .fingerprint import get_file_fingerprint, get_mesh_fingerprint
+from .indexed_mesh import IndexedMesh
+from .mesh_decimation import DEFAULT_TARGET_FACES, DctDecimationDrift, decimate_mesh, get_drift
+from .mesh_io import load_meshes, save_meshes
+from .mesh_repair import DEFAULT_REPAIR_MEMORY_LIMIT, DEFAULT_REPAIR_TIMEOUT, fast_repair, pymeshfix_repair
 from .mesh_types import MeshProcessorBase
-from .tweaker import FileHandler, Tweak
+from .orientation import get_orientation_matrix
+from .orientation_cache import OrientationCache
+from .tweaker import Tweak
+
+
+IDENTITY_MATRIX = np.identity(3)
+
+
+def get_tweak_matrix(corners: np.ndarray) -> np.ndarray:
+    # Tweak takes the corners of every facet, its matrix rotates row vectors
+    return np.asarray(Tweak(corners, verbose=False).matrix, dtype=np.float64)
+
+
+def _tweak_shared_part(
+    get_matrix: Callable[[np.ndarray], np.ndarray],
+    shm_name: str,
+    start: int,
+    stop: int,
+    connection: Connection
+) -> None:
+    shm = SharedMemory(name=shm_name)
+    try:
+        corners = np.ndarray((stop, 3), dtype=np.float64, buffer=shm.buf)[start:]
+        connection.send(get_matrix(corners))
+        del corners
+    finally:
+        shm.close()
+        connection.close()
 
 
-class MeshRepairer(MeshProcessorBase):
+class IndexedMeshProcessorBase(MeshProcessorBase):
+
+    def _get_input_fingerprint(self) -> str:
+        # Copies of a model in another format or facet order share their results
+        return get_file_fingerprint(self.input_file, self.mesh_cache)
+
+    def _load_mesh(self) -> list[IndexedMesh]:
+        return load_meshes(self.input_file)
+
+    def _save_processed_mesh(self, processed_mesh: list[IndexedMesh], output_file: str) -> str:
+        return save_meshes(processed_mesh, output_file)
+
+
+class MeshRepairer(IndexedMeshProcessorBase):
+    """Fixes the cheap defects with NumPy and hands what is still not manifold to pymeshfix.
+
+    pymeshfix runs in a child process limited to ``timeout`` seconds and
+    ``memory_limit`` bytes, past them the NumPy result is kept and not cached.
+    """
     _PREFIX_OPERATION = 'repair_'
 
-    def _save_processed_mesh(self, processed_mesh: PyTMesh, output_file: str) -> str:
-        processed_mesh.save_file(output_file)
-        return glob.glob(output_file)[0]
+    def __init__(
+        self,
+        input_file: ExistsFileType,
+        *decorators: Type[MeshProcessorBase],
+        mesh_cache: Optional[FileCache] = None,
+        timeout: Optional[float] = DEFAULT_REPAIR_TIMEOUT,
+        memory_limit: Optional[int] = DEFAULT_REPAIR_MEMORY_LIMIT
+    ) -> None:
+        super().__init__(input_file, *decorators, mesh_cache=mesh_cache)
+        self._timeout = timeout
+        self._memory_limit = memory_limit
+        self._fallback_failed = False
+
+    @property
+    def timeout(self) -> Optional[float]:
+        return self._timeout
+
+    @property
+    def memory_limit(self) -> Optional[int]:
+        return self._memory_limit
+
+    @property
+    def fallback_failed(self) -> bool:
+        return self._fallback_failed
+
+    def _is_cacheable(self) -> bool:
+        return not self.fallback_failed
+
+    def process_meshes(self, parts: list[IndexedMesh]) -> list[IndexedMesh]:
+        repaired = fast_repair(IndexedMesh.concatenate(parts))
+        if repaired.is_manifold:
+            return [repaired]
+        fixed = pymeshfix_repair(repaired, self.timeout, self.memory_limit)
+        if fixed is None:
+            self._fallback_failed = True
+            return [repaired]
+        return [fixed]
+
+
+class MeshDecimator(IndexedMeshProcessorBase):
+    """Simplifies the mesh to ``target_faces`` facets or within ``max_error`` mm, for quotes and previews.
+
+    The target is shared among the parts by their facet count. The volume
+    and bounding box drift of the last run is kept in ``drift``.
+    """
+    _PREFIX_OPERATION = 'decimate_'
 
-    def _process_mesh(self) -> PyTMesh:
-        tin = PyTMesh(False)  # verbose = False
-        tin.load_file(self.input_file)
-        tin.fill_small_boundaries()
-        tin.remove_smallest_components()
-        return tin
+    def __init__(
+        self,
+        input_file: ExistsFileType,
+        *decorators: Type[MeshProcessorBase],
+        mesh_cache: Optional[FileCache] = None,
+        target_faces: Optional[int] = DEFAULT_TARGET_FACES,
+        max_error: Optional[float] = None
+    ) -> None:
+        super().__init__(input_file, *decorators, mesh_cache=mesh_cache)
+        self._target_faces = target_faces
+        self._max_error = max_error
+        self._drift: Optional[DctDecimationDrift] = None
 
+    @property
+    def target_faces(self) -> Optional[int]:
+        return self._target_faces
+
+    @property
+    def max_error(self) -> Optional[float]:
+        return self._max_error
 
-class MeshTweaker(MeshProcessorBase):
+    @property
+    def drift(self) -> Optional[DctDecimationDrift]:
+        return self._drift
+
+    @classmethod
+    def _get_cache_params(cls) -> dict:
+        return {'target_faces': DEFAULT_TARGET_FACES, 'max_error': None}
+
+    def _get_instance_cache_params(self) -> dict:
+        return {'target_faces': self.target_faces, 'max_error': self.max_error}
+
+    def process_meshes(self, parts: list[IndexedMesh]) -> list[IndexedMesh]:
+        total_faces = sum(len(part.faces) for part in parts)
+        decimated = []
+        for part in parts:
+            target = None
+            if self.target_faces is not None:
+                target = max(1, self.target_faces * len(part.faces) // max(total_faces, 1))
+            decimated.append(decimate_mesh(part, target, self.max_error))
+        self._drift = get_drift(IndexedMesh.concatenate(parts), IndexedMesh.concatenate(decimated))
+        return decimated
+
+
+class MeshTweaker(IndexedMeshProcessorBase):
+    """Orients every part of the mesh with Tweak.
+
+    With ``max_workers`` above one the parts are oriented in worker processes
+    reading their facets from shared memory. A part not oriented within
+    ``part_timeout`` seconds is killed and left as it is. Parts found in
+    ``orientation_cache`` are only rotated.
+    """
     _PREFIX_OPERATION = 'tweak_'
+    _get_matrix = staticmethod(get_tweak_matrix)
 
     def __init__(
         self,
         input_file: ExistsFileType,
-        *mesh_operation: Type[MeshProcessorBase]
+        *decorators: Type[MeshProcessorBase],
+        mesh_cache: Optional[FileCache] = None,
+        max_workers: int = 1,
+        part_timeout: Optional[float] = None,
+        orientation_cache: Optional[OrientationCache] = None
     ) -> None:
-        super().__init__(input_file, *mesh_operation)
-        self._file_handler = FileHandler()
+        super().__init__(input_file, *decorators, mesh_cache=mesh_cache)
+        self._max_workers = max(1, max_workers)
+        self._part_timeout = part_timeout
+        self._orientation_cache = orientation_cache
+        self._timed_out_parts: list[int] = []
 
     @property
-    def file_handler(self) -> FileHandler:
-        return self._file_handler
+    def max_workers(self) -> int:
+        return self._max_workers
+
+    @property
+    def part_timeout(self) -> Optional[float]:
+        return self._part_timeout
+
+    @property
+    def orientation_cache(self) -> Optional[OrientationCache]:
+        return self._orientation_cache
+
+    @property
+    def timed_out_parts(self) -> list[int]:
+        return self._timed_out_parts
+
+    def _get_orientation_key(self, part: IndexedMesh) -> str:
+        params = {'orienter': type(self).__name__, **self._get_cache_params()}
+        return OrientationCache.get_key(get_mesh_fingerprint(part), params)
+
+    def _is_cacheable(self) -> bool:
+        return not self.timed_out_parts
+
+    def _get_matrices_in_processes(self, parts_corners: list[np.ndarray]) -> list[np.ndarray]:
+        bounds = np.cumsum([0] + [len(corners) for corners in parts_corners])
+        shm = SharedMemory(create=True, size=max(1, int(bounds[-1]) * 3 * 8))
+        running: dict[int, tuple[multiprocessing.Process, Connection, float]] = {}
+        try:
+            shared = np.ndarray((int(bounds[-1]), 3), dtype=np.float64, buffer=shm.buf)
+            for corners, start in zip(parts_corners, bounds):
+                shared[start:start + len(corners)] = corners
+            del shared
+
+            matrices: list[np.ndarray] = [IDENTITY_MATRIX] * len(parts_corners)
+            pending = deque(range(len(parts_corners)))
+            while pending or running:
+                while pending and len(running) < self.max_workers:
+                    i = pending.popleft()
+                    receiver, sender = multiprocessing.Pipe(duplex=False)
+                    process = multiprocessing.Process(
+                        target=_tweak_shared_part,
+                        args=(self._get_matrix, shm.name, int(bounds[i]), int(bounds[i + 1]), sender),
+                        daemon=True
+                    )
+                    process.start()
+                    sender.close()
+                    deadline = time.monotonic() + self.part_timeout if self.part_timeout is not None else float('inf')
+                    running[i] = (process, receiver, deadline)
+
+                next_deadline = min(deadline for _, _, deadline in running.values())
+                timeout = None if next_deadline == float('inf') else max(0.0, next_deadline - time.monotonic())
+                wait([receiver for _, receiver, _ in running.values()], timeout)
+
+                for i, (process, receiver, deadline) in list(running.items()):
+                    if receiver.poll():
+                        try:
+                            matrices[i] = receiver.recv()
+                        except EOFError:
+                            # The worker died without an answer, the part keeps its orientation
+                            self._timed_out_parts.append(i)
+                    elif time.monotonic() >= deadline:
+                        process.kill()
+                        self._timed_out_parts.append(i)
+                    else:
+                        continue
+                    process.join()
+                    receiver.close()
+                    del running[i]
+            self._timed_out_parts.sort()
+            return matrices
+        finally:
+            for process, receiver, _ in running.values():
+                process.kill()
+                process.join()
+                receiver.close()
+            shm.close()
+            shm.unlink()
+
+    def process_meshes(self, parts: list[IndexedMesh]) -> list[IndexedMesh]:
+        keys: list[str] = []
+        matrices: list[Optional[np.ndarray]] = [None] * len(parts)
+        if self.orientation_cache is not None:
+            keys = [self._get_orientation_key(part) for part in parts]
+            matrices = [self.orientation_cache.get_matrix(key) for key in keys]
+
+        missing = [i for i, matrix in enumerate(matrices) if matrix is None]
+        parts_corners = [parts[i].triangles.reshape(-1, 3).astype(np.float64) for i in missing]
+        if self.part_timeout is None and (self.max_workers == 1 or len(missing) < 2):
+            found = [self._get_matrix(corners) for corners in parts_corners]
+        else:
+            found = self._get_matrices_in_processes(parts_corners)
+            self._timed_out_parts = [missing[j] for j in self._timed_out_parts]
+        for i, matrix in zip(missing, found):
+            matrices[i] = matrix
+            # A part left as it is after a timeout was never oriented
+            if self.orientation_cache is not None and i not in self.timed_out_parts:
+                self.orientation_cache.put_matrix(keys[i], matrix)
+        return [part.transform(matrix) for part, matrix in zip(parts, matrices)]
+
 
-    def _save_processed_mesh(self, processed_mesh: tuple[dict, dict], output_file: str) -> str:
-        loaded_mesh, info_about_mesh = processed_mesh
-        lst_files = self.file_handler.write_mesh(
-            loaded_mesh, info_about_mesh, output_file
-        )
-        return lst_files[0]
+class MeshFastTweaker(MeshTweaker):
+    """Orients every part like MeshTweaker, scoring all candidate orientations in batched NumPy passes.
 
-    def _process_mesh(self) -> tuple[dict, dict]:
-        loaded_mesh = self.file_handler.load_mesh(self.input_file)
-        info_about_mesh = {}
-        for part, content in loaded_mesh.items():
-            info_about_mesh[part] = {
-                'matrix': Tweak(content['mesh'], verbose=False).matrix
-            }
-        return loaded_mesh, info_about_mesh
+    The orientation may differ from Tweak's, see ``get_orientation_matrix``.
+    """
+    _get_matrix = staticmethod(get_orientation_matrix)
 
 
 __all__ = [
+    'MeshDecimator',
+    'MeshFastTweaker',
     'MeshRepairer',
     'MeshTweaker'
 ]
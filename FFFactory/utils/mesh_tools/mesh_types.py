@@ -1,51 +1,160 @@
+import hashlib
+import json
 import os
 
 from abc import ABC, abstractmethod
 from functools import cached_property
-from typing import Type
+from typing import Optional, Type, TypedDict
 
+from FFFactory.utils.cache_tools import FileCache, file_sha256, link_file
 from FFFactory.utils.systems_util import ExistsDirType, ExistsFileType
+from .indexed_mesh import IndexedMesh
+
+
+MESH_CACHE_FORMAT = '4'
+MESH_CACHE_MANIFEST_SUFFIX = '.json'
+# Output cut short, e.g. by a timeout, is saved under this prefix so it is never reused as finished
+INCOMPLETE_PREFIX = 'incomplete_'
+
+
+class DctInfoAboutModel(TypedDict):
+    file_name: str
+    size_x: float
+    size_y: float
+    size_z: float
+    min_x: float
+    min_y: float
+    min_z: float
+    max_x: float
+    max_y: float
+    max_z: float
+    number_of_facets: int
+    manifold: bool
+    open_edges: int
+    facets_reversed: int
+    backwards_edges: int
+    number_of_parts: int
+    volume: float
 
 
 class MeshProcessorBase(ABC):
     _PREFIX_OPERATION = 'op_'
+    _OUTPUT_FILE_TYPE = '.stl'
 
     def __init__(
         self,
         input_file: ExistsFileType,
-        *decorators: Type['MeshProcessorBase']
+        *decorators: Type['MeshProcessorBase'],
+        mesh_cache: Optional[FileCache] = None
     ) -> None:
         if isinstance(input_file, ExistsFileType):
             self._input_file = input_file
         else:
             raise TypeError(f"Unknown type for input_file: {type(input_file)}")
         self._decorators = decorators
+        self._mesh_cache = mesh_cache
+        self._stages: list[MeshProcessorBase] = []
 
     @property
     def input_file(self) -> str:
         return self._input_file.value
 
+    @property
+    def mesh_cache(self) -> Optional[FileCache]:
+        return self._mesh_cache
+
+    @property
+    def stages(self) -> list['MeshProcessorBase']:
+        """Decorators of the last run of the chain, empty when the output came from a cache."""
+        return self._stages
+
+    @classmethod
+    def _get_cache_params(cls) -> dict:
+        return {}
+
+    def _get_instance_cache_params(self) -> dict:
+        # Parameters given to the constructor, decorators always run with the class defaults
+        return self._get_cache_params()
+
+    def _get_input_fingerprint(self) -> str:
+        return file_sha256(self.input_file)
+
+    def get_cache_key(self) -> str:
+        # The decorators run first, so the chain is part of the key
+        chain = [[processor.__name__, processor._get_cache_params()] for processor in self._decorators]
+        chain.append([type(self).__name__, self._get_instance_cache_params()])
+        key = {
+            'format': MESH_CACHE_FORMAT,
+            'input': self._get_input_fingerprint(),
+            'chain': chain,
+        }
+        return hashlib.sha256(json.dumps(key, sort_keys=True).encode()).hexdigest()
+
+    def get_output_name(self) -> str:
+        prefixes = ''.join(
+            processor._PREFIX_OPERATION for processor in (type(self), *reversed(self._decorators))
+        )
+        base_name = os.path.splitext(os.path.basename(self.input_file))[0]
+        return prefixes + base_name + self._OUTPUT_FILE_TYPE
+
+    def _is_cacheable(self) -> bool:
+        return True
+
+    def _is_chain_cacheable(self) -> bool:
+        return all(stage._is_cacheable() for stage in (*self._stages, self))
+
     @abstractmethod
-    def _save_processed_mesh(self, processed_mesh, output_file: str) -> str:
+    def _load_mesh(self) -> list[IndexedMesh]:
         raise NotImplementedError()
 
-    def save_processed_mesh(self, output_dir: ExistsDirType) -> str:
-        for decorator in self._decorators:
-            result_decorator = decorator(
-                self._input_file
-            ).save_processed_mesh(output_dir)
-            self._input_file = ExistsFileType(result_decorator)
-
-        base_name = os.path.basename(self.input_file)
-        output_file = os.path.join(output_dir.value, self._PREFIX_OPERATION + base_name)
-        if os.path.exists(output_file):
-            return output_file
-        return self._save_processed_mesh(self.processed_mesh, output_file)
+    @abstractmethod
+    def process_meshes(self, parts: list[IndexedMesh]) -> list[IndexedMesh]:
+        raise NotImplementedError()
 
     @abstractmethod
-    def _process_mesh(self):
+    def _save_processed_mesh(self, processed_mesh: list[IndexedMesh], output_file: str) -> str:
         raise NotImplementedError()
 
+    def _save_chain(self, output_dir: ExistsDirType) -> tuple[str, bool]:
+        """:return: output file, whether the chain ran to produce it"""
+        output_file = os.path.join(output_dir.value, self.get_output_name())
+        # An output older than its input belongs to a previous version of the model
+        if os.path.exists(output_file) and os.path.getmtime(output_file) >= os.path.getmtime(self.input_file):
+            return output_file, False
+        processed_mesh = self.processed_mesh
+        if not self._is_chain_cacheable():
+            output_file = os.path.join(output_dir.value, INCOMPLETE_PREFIX + self.get_output_name())
+        return self._save_processed_mesh(processed_mesh, output_file), True
+
+    def save_processed_mesh(self, output_dir: ExistsDirType) -> str:
+        if self.mesh_cache is None:
+            return self._save_chain(output_dir)[0]
+
+        key = self.get_cache_key()
+        # Workers processing the same geometry wait for the first one instead of repeating it
+        with self.mesh_cache.lock(key):
+            entry_path = self.mesh_cache.get_path(key)
+            manifest = self.mesh_cache.get_json(key + MESH_CACHE_MANIFEST_SUFFIX) if entry_path else None
+            if entry_path is not None and manifest is not None:
+                return link_file(entry_path, os.path.join(output_dir.value, self.get_output_name()))
+            output_file, processed = self._save_chain(output_dir)
+            # A result cut short, e.g. by a timeout, is not reused for other models, and a file
+            # found next to the model is not known to be complete
+            if processed and self._is_chain_cacheable():
+                self.mesh_cache.put_file(key, output_file)
+                self.mesh_cache.put_json(
+                    key + MESH_CACHE_MANIFEST_SUFFIX, {'file_name': os.path.basename(output_file)}
+                )
+            return output_file
+
+    def _process_mesh(self) -> list[IndexedMesh]:
+        # The mesh is loaded once and handed from stage to stage in memory
+        parts = self._load_mesh()
+        self._stages = [decorator(self._input_file) for decorator in self._decorators]
+        for stage in self._stages:
+            parts = stage.process_meshes(parts)
+        return self.process_meshes(parts)
+
     @cached_property
-    def processed_mesh(self):
+    def processed_mesh(self) -> list[IndexedMesh]:
         return self._process_mesh()
@@ -0,0 +1,135 @@
+import re
+
+import numpy as np
+
+from .indexed_mesh import IndexedMesh
+
+
+_COMMENT = re.compile(rb'#[^\n]*')
+_WHITESPACE = (ord(' '), ord('\t'))
+
+# Markers split the numbers of one bulk parse back into records, a
+# coordinate is never NaN and an OBJ index is never 0
+VERTEX_MARKER = b'nan'
+FACE_MARKER = b'0'
+
+
+def _classify_lines(data: bytes) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Finds the lines of the file and their one-letter record keyword.
+
+    :return: line starts, line ends, keyword of every line (0 for other records)
+    """
+    chars = np.frombuffer(data, dtype=np.uint8)
+    newlines = np.flatnonzero(chars == ord('\n'))
+    starts = np.concatenate([[0], newlines + 1])
+    ends = np.concatenate([newlines, [len(chars)]])
+    keywords = np.zeros(len(starts), dtype=np.uint8)
+    long_enough = ends - starts >= 2
+    first = chars[starts[long_enough]]
+    second = chars[starts[long_enough] + 1]
+    keywords[long_enough] = np.where(np.isin(second, _WHITESPACE), first, 0)
+    return starts, ends, keywords
+
+
+def _get_records_text(data: bytes, starts: np.ndarray, ends: np.ndarray, lines: np.ndarray, marker: bytes) -> bytes:
+    """Joins the given lines with their keyword replaced by a marker.
+
+    Consecutive lines are copied as one slice, so files with a block of
+    vertices and a block of faces cost two copies.
+    """
+    if not len(lines):
+        return b''
+    breaks = np.flatnonzero(np.diff(lines) != 1) + 1
+    first_lines = lines[np.concatenate([[0], breaks])]
+    last_lines = lines[np.concatenate([breaks - 1, [len(lines) - 1]])]
+    text = b'\n' + b'\n'.join(data[starts[a]:ends[b]] for a, b in zip(first_lines, last_lines))
+    keyword = text[1:2]
+    text = text.replace(b'\n' + keyword, b'\n' + marker + b' ')
+    if b'#' in text:
+        text = _COMMENT.sub(b'', text)
+    return text
+
+
+def _parse_records(text: bytes, count: int, dtype: type) -> tuple[np.ndarray, np.ndarray]:
+    """:return: numbers without markers, index of the first number of every record"""
+    values = np.fromstring(text, dtype=dtype, sep=' ') if text else np.zeros(0, dtype=dtype)  # type: ignore
+    is_marker = np.isnan(values) if dtype is np.float64 else values == 0
+    markers = np.flatnonzero(is_marker)
+    if len(markers) != count:
+        raise ValueError('Malformed OBJ record')
+    return values[~is_marker], markers - np.arange(len(markers))
+
+
+def _parse_vertices(text: bytes, count: int) -> np.ndarray:
+    values, starts = _parse_records(text, count, np.float64)
+    counts = np.diff(np.append(starts, len(values)))
+    if np.any(counts < 3):
+        raise ValueError('OBJ vertex with less than 3 coordinates')
+    # Colors or a w coordinate may follow x y z
+    return values[starts[:, None] + np.arange(3)]
+
+
+def _count_per_record(chars: np.ndarray, record_starts: np.ndarray, mask: np.ndarray) -> np.ndarray:
+    positions = np.flatnonzero(mask)
+    return np.diff(np.searchsorted(positions, np.append(record_starts, len(chars))))
+
+
+def _parse_faces(text: bytes, count: int) -> tuple[np.ndarray, np.ndarray]:
+    """Fan triangulates every polygon.
+
+    :return: triangles as raw OBJ indices, record of every triangle
+    """
+    # Every record starts after a newline, its corners are v, v/vt, v//vn or v/vt/vn
+    chars = np.frombuffer(text, dtype=np.uint8)
+    record_starts = np.flatnonzero(chars == ord('\n'))
+    is_slash = chars == ord('/')
+    slashes = _count_per_record(chars, record_starts, is_slash)
+    double_slashes = _count_per_record(chars, record_starts, is_slash & np.append(is_slash[1:], False))
+
+    values, starts = _parse_records(text.replace(b'/', b' '), count, np.int64)
+    numbers = np.diff(np.append(starts, len(values)))
+    # Each slash adds a number to its corner except the first of a double slash
+    corners = numbers - slashes + double_slashes
+    per_corner = numbers // np.maximum(corners, 1)
+    if np.any(corners < 0) or np.any(per_corner * corners != numbers):
+        raise ValueError('Malformed OBJ face')
+
+    triangles_per_face = np.maximum(corners - 2, 0)
+    face_ids = np.repeat(np.arange(len(corners)), triangles_per_face)
+    first = np.cumsum(triangles_per_face) - triangles_per_face
+    fan = np.arange(len(face_ids)) - first[face_ids] + 1
+    corner_a = starts[face_ids]
+    corner_b = corner_a + fan * per_corner[face_ids]
+    corner_c = corner_b + per_corner[face_ids]
+    return np.stack([values[corner_a], values[corner_b], values[corner_c]], axis=1), face_ids
+
+
+def load_obj_meshes(file_path: str) -> list[IndexedMesh]:
+    """Reads the vertices and faces of a Wavefront OBJ file into one part."""
+    with open(file_path, 'rb') as f:
+        data = f.read()
+    starts, ends, keywords = _classify_lines(data)
+    vertex_lines = np.flatnonzero(keywords == ord('v'))
+    face_lines = np.flatnonzero(keywords == ord('f'))
+    vertices = _parse_vertices(
+        _get_records_text(data, starts, ends, vertex_lines, VERTEX_MARKER), len(vertex_lines)
+    )
+    faces, face_ids = _parse_faces(
+        _get_records_text(data, starts, ends, face_lines, FACE_MARKER), len(face_lines)
+    )
+
+    negative = faces < 0
+    if negative.any():
+        # A negative index counts back from the last vertex read before its face
+        vertices_before = np.searchsorted(vertex_lines, face_lines)[face_ids]
+        faces = np.where(negative, faces + vertices_before[:, None], faces - 1)
+    else:
+        faces = faces - 1
+    if len(faces) and (faces.min() < 0 or faces.max() >= len(vertices)):
+        raise ValueError('Face index out of range in %s' % file_path)
+    return [IndexedMesh(vertices, faces)]
+
+
+__all__ = [
+    'load_obj_meshes',
+]
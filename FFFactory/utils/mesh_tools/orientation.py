@@ -0,0 +1,153 @@
+from typing import TypedDict
+
+import numpy as np
+
+from .indexed_mesh import IndexedMesh, get_unique_rows
+
+
+DOWN = np.array([0.0, 0.0, -1.0])
+AXES = np.vstack([DOWN, np.identity(3), -np.identity(3)])
+
+# Same meaning as the parameters of Tweak
+VECTOR_TOL = 0.001
+FIRST_LAYER_HEIGHT = 0.25
+OVERHANG_COSINE = np.cos(np.radians(45.0))
+ABSOLUTE_F = 100.0
+RELATIVE_F = 1.0
+CONTOUR_F = 0.5
+
+CANDIDATES_COUNT = 30
+NORMAL_DECIMALS = 3
+# Candidates times facets evaluated at once, about 50 MB of temporaries
+CHUNK_CELLS = 1 << 21
+
+
+class DctOrientationScores(TypedDict):
+    bottom: np.ndarray
+    overhang: np.ndarray
+    contour: np.ndarray
+    unprintability: np.ndarray
+
+
+def _get_unit_normals(mesh: IndexedMesh) -> tuple[np.ndarray, np.ndarray]:
+    """:return: unit normals, areas of the facets"""
+    normals = mesh.face_normals
+    lengths = np.linalg.norm(normals, axis=1)
+    unit = np.divide(normals, lengths[:, None], out=np.zeros_like(normals), where=lengths[:, None] > 0)
+    return unit, lengths / 2.0
+
+
+def get_candidates(mesh: IndexedMesh, count: int = CANDIDATES_COUNT) -> np.ndarray:
+    """Directions facing down in the candidate orientations, the current one first.
+
+    The normals covering the largest total area are candidates, together
+    with the axes.
+    """
+    unit, areas = _get_unit_normals(mesh)
+    rounded = np.round(unit, NORMAL_DECIMALS) + 0.0
+    first, inverse = get_unique_rows(rounded)
+    directions = rounded[first]
+    totals = np.bincount(inverse, weights=areas, minlength=len(directions))
+    largest = directions[np.argsort(-totals, kind='stable')[:count]]
+    largest = largest[np.linalg.norm(largest, axis=1) > 0]
+    candidates = np.vstack([AXES, largest / np.linalg.norm(largest, axis=1, keepdims=True)])
+    _, first = np.unique(np.round(candidates, NORMAL_DECIMALS), axis=0, return_index=True)
+    return candidates[np.sort(first)]
+
+
+def get_unprintability(bottom: np.ndarray, overhang: np.ndarray, contour: np.ndarray) -> np.ndarray:
+    return overhang / ABSOLUTE_F + (overhang + 1.0) / (1.0 + CONTOUR_F * contour + bottom) / RELATIVE_F
+
+
+def evaluate_orientations(
+    mesh: IndexedMesh,
+    candidates: np.ndarray,
+    chunk_cells: int = CHUNK_CELLS
+) -> DctOrientationScores:
+    """Scores every candidate down direction in one pass over the facets per chunk of candidates.
+
+    :param candidates: unit vectors, the facet normals equal to one of them face the bed
+    """
+    unit, areas = _get_unit_normals(mesh)
+    faces = mesh.faces
+    vertices = mesh.vertices.astype(np.float64)
+    triangles = mesh.triangles.astype(np.float64)
+    edge_lengths = np.linalg.norm(triangles[:, [1, 2, 0]] - triangles, axis=2)
+    # A missing neighbor, -1, points at an extra row which is never on the bed
+    neighbors = mesh.face_neighbors
+    n_candidates = len(candidates)
+    bottom = np.zeros(n_candidates)
+    overhang = np.zeros(n_candidates)
+    contour = np.zeros(n_candidates)
+
+    step = max(1, chunk_cells // max(len(faces), 1))
+    for start in range(0, n_candidates, step):
+        chunk = np.asarray(candidates[start:start + step], dtype=np.float64)
+        heights = -(vertices @ chunk.T)
+        # Only whether a corner lies in the first layer matters, gathered as bytes
+        low = heights - heights.min(axis=0) < FIRST_LAYER_HEIGHT
+        low_corners = low[faces]
+        cosines = unit @ chunk.T
+
+        on_bed = (cosines > 1.0 - VECTOR_TOL) & low_corners.all(axis=1)
+        bottom[start:start + step] = areas @ on_bed
+        overhanging = (cosines > OVERHANG_COSINE) & ~low_corners.any(axis=1)
+        overhang[start:start + step] = areas @ np.where(overhanging, cosines, 0.0)
+
+        # The outline is made of the edges of bed facets without a bed facet across
+        rows = np.flatnonzero(on_bed.any(axis=1))
+        on_bed_padded = np.vstack([on_bed, np.zeros((1, len(chunk)), dtype=bool)])
+        outline = on_bed[rows, None, :] & ~on_bed_padded[neighbors[rows]]
+        contour[start:start + step] = np.einsum('fe,fek->k', edge_lengths[rows], outline)
+
+    return DctOrientationScores(
+        bottom=bottom,
+        overhang=overhang,
+        contour=contour,
+        unprintability=get_unprintability(bottom, overhang, contour),
+    )
+
+
+def get_rotation_matrix(direction: np.ndarray) -> np.ndarray:
+    """Rotation turning ``direction`` down, applied to row vectors as ``vertices @ matrix``."""
+    direction = np.asarray(direction, dtype=np.float64)
+    direction = direction / np.linalg.norm(direction)
+    axis = np.cross(direction, DOWN)
+    sine = np.linalg.norm(axis)
+    cosine = float(direction @ DOWN)
+    if sine < VECTOR_TOL:
+        # Already down, or straight up and turned over around x
+        return np.identity(3) if cosine > 0 else np.diag([1.0, -1.0, -1.0])
+    axis /= sine
+    cross = np.array([
+        [0.0, -axis[2], axis[1]],
+        [axis[2], 0.0, -axis[0]],
+        [-axis[1], axis[0], 0.0],
+    ])
+    rotation = np.identity(3) + sine * cross + (1.0 - cosine) * (cross @ cross)
+    return rotation.T
+
+
+def get_orientation_matrix(corners: np.ndarray) -> np.ndarray:
+    """Replacement of ``Tweak(corners).matrix`` scoring all candidates at once.
+
+    The score follows Tweak, but the candidates are only the axes and the
+    ``CANDIDATES_COUNT`` largest facet directions, the contour is the exact
+    outline of the bed facets and the matrix is the shortest turn, so
+    another orientation or turn around Z than Tweak's may be chosen.
+    """
+    mesh = IndexedMesh.from_triangles(np.asarray(corners).reshape(-1, 3, 3))
+    if not len(mesh.faces):
+        return np.identity(3)
+    candidates = get_candidates(mesh)
+    scores = evaluate_orientations(mesh, candidates)
+    return get_rotation_matrix(candidates[int(np.argmin(scores['unprintability']))])
+
+
+__all__ = [
+    'DctOrientationScores',
+    'evaluate_orientations',
+    'get_candidates',
+    'get_orientation_matrix',
+    'get_rotation_matrix',
+]
@@ -0,0 +1,62 @@
+import hashlib
+import json
+from typing import Optional
+
+import numpy as np
+
+from FFFactory.utils.cache_tools import DctCacheStats, FileCache
+
+
+# Bumped whenever the stored entry changes shape
+ORIENTATION_CACHE_FORMAT = '1'
+ORIENTATION_CACHE_SUFFIX = '.orientation'
+
+
+class OrientationCache:
+    """Rotation matrices of oriented parts stored by geometry fingerprint and orientation parameters."""
+
+    def __init__(self, file_cache: FileCache):
+        self._file_cache = file_cache
+        self._hits = 0
+        self._misses = 0
+
+    @property
+    def file_cache(self) -> FileCache:
+        return self._file_cache
+
+    @staticmethod
+    def get_key(fingerprint: str, params: dict) -> str:
+        key = {
+            'format': ORIENTATION_CACHE_FORMAT,
+            'fingerprint': fingerprint,
+            'params': params,
+        }
+        return hashlib.sha256(json.dumps(key, sort_keys=True).encode()).hexdigest()
+
+    def get_matrix(self, key: str) -> Optional[np.ndarray]:
+        entry = self.file_cache.get_json(key + ORIENTATION_CACHE_SUFFIX)
+        if entry is None:
+            self._misses += 1
+            return None
+        self._hits += 1
+        return np.array(entry['matrix'], dtype=np.float64)
+
+    def put_matrix(self, key: str, matrix: np.ndarray) -> None:
+        self.file_cache.put_json(key + ORIENTATION_CACHE_SUFFIX, {'matrix': np.asarray(matrix).tolist()})
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self._hits + self._misses
+        return self._hits / lookups if lookups else 0.0
+
+    @property
+    def stats(self) -> DctCacheStats:
+        stats = self.file_cache.stats
+        stats['hits'] = self._hits
+        stats['misses'] = self._misses
+        return stats
+
+
+__all__ = [
+    'OrientationCache',
+]
@@ -0,0 +1,96 @@
+from decimal import Decimal
+from typing import Sequence, TypedDict
+
+import numpy as np
+
+from FFFactory.utils.auto_slicer.consts.slicer_const import MAX_SIZE_X_Y, MAX_SIZE_Z
+from .indexed_mesh import IndexedMesh
+from .mesh_io import load_meshes
+
+
+# Extents in mm, a model outside of them is a unit or export mistake
+MIN_EXTENT = 1e-3
+MAX_EXTENT = 1e6
+
+PREFLIGHT_UNREADABLE = 'unreadable'
+PREFLIGHT_EMPTY = 'empty'
+PREFLIGHT_NON_FINITE = 'non_finite'
+PREFLIGHT_ZERO_EXTENT = 'zero_extent'
+PREFLIGHT_ABSURD_SIZE = 'absurd_size'
+PREFLIGHT_SIZE_NOT_FIT = 'size_not_fit'
+
+
+class DctPreflightReason(TypedDict):
+    code: str
+    message: str
+    # A fatal reason rejects the job, the others only skip a part of it
+    fatal: bool
+
+
+class PreflightError(Exception):
+    def __init__(self, reasons: list[DctPreflightReason]) -> None:
+        super().__init__('; '.join(reason['message'] for reason in reasons))
+        self.reasons = reasons
+
+
+def _get_reason(code: str, message: str, fatal: bool = True) -> DctPreflightReason:
+    return DctPreflightReason(code=code, message=message, fatal=fatal)
+
+
+def check_mesh(mesh: IndexedMesh) -> list[DctPreflightReason]:
+    """Finds the defects no slicer run can get past, in a few passes over the vertices."""
+    if not len(mesh.faces) or not len(mesh.vertices):
+        return [_get_reason(PREFLIGHT_EMPTY, 'Mesh has no facets')]
+    finite = np.isfinite(mesh.vertices).all(axis=1)
+    if not finite.all():
+        return [_get_reason(
+            PREFLIGHT_NON_FINITE, 'Mesh has %d vertices with NaN or infinite coordinates' % np.count_nonzero(~finite)
+        )]
+    min_xyz, max_xyz = mesh.get_bounds()
+    size_xyz = max_xyz - min_xyz
+    if size_xyz.min() < MIN_EXTENT:
+        return [_get_reason(PREFLIGHT_ZERO_EXTENT, 'Mesh is flat, its size is %s mm' % size_xyz.round(6).tolist())]
+    if size_xyz.max() > MAX_EXTENT:
+        return [_get_reason(PREFLIGHT_ABSURD_SIZE, 'Mesh size %s mm is absurd' % size_xyz.round(3).tolist())]
+    return []
+
+
+def check_file(file_path: str) -> list[DctPreflightReason]:
+    try:
+        meshes = load_meshes(file_path)
+    except Exception as e:
+        return [_get_reason(PREFLIGHT_UNREADABLE, 'Cannot read %s: %s' % (file_path, e))]
+    return check_mesh(IndexedMesh.concatenate(meshes))
+
+
+def get_size_reasons(
+    sizes: Sequence[tuple[Decimal, Decimal, Decimal]],
+    fatal: bool,
+    max_size_xyz: Sequence[float] = (*MAX_SIZE_X_Y, MAX_SIZE_Z)
+) -> list[DctPreflightReason]:
+    """Reasons for the scaled sizes over the printer, fatal when no size of the job fits."""
+    return [
+        _get_reason(
+            PREFLIGHT_SIZE_NOT_FIT,
+            'Scale Z %.1f mm needs %.1f x %.1f x %.1f mm, the printer holds %s x %s x %s mm' % (
+                z, x, y, z, *max_size_xyz
+            ),
+            fatal
+        )
+        for x, y, z in sizes
+    ]
+
+
+def raise_for_reasons(reasons: list[DctPreflightReason]) -> None:
+    if any(reason['fatal'] for reason in reasons):
+        raise PreflightError(reasons)
+
+
+__all__ = [
+    'DctPreflightReason',
+    'PreflightError',
+    'check_file',
+    'check_mesh',
+    'get_size_reasons',
+    'raise_for_reasons',
+]
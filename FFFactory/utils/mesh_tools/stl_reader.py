@@ -0,0 +1,82 @@
+import os
+import re
+
+import numpy as np
+
+
+STL_HEADER_SIZE = 80
+STL_COUNT_SIZE = 4
+STL_DATA_OFFSET = STL_HEADER_SIZE + STL_COUNT_SIZE
+STL_DTYPE = np.dtype([
+    ('normals', '<f4', (3,)),
+    ('vectors', '<f4', (3, 3)),
+    ('attr', '<u2'),
+])
+# An ASCII file names its first facet within the first lines
+ASCII_PROBE_SIZE = 1024
+
+_ASCII_VERTEX = re.compile(rb'vertex\s+(\S+)\s+(\S+)\s+(\S+)')
+
+
+def get_facet_count(file_path: str) -> int:
+    with open(file_path, 'rb') as f:
+        f.seek(STL_HEADER_SIZE)
+        data = f.read(STL_COUNT_SIZE)
+    return int(np.frombuffer(data, dtype='<u4')[0]) if len(data) == STL_COUNT_SIZE else 0
+
+
+def is_binary_stl(file_path: str) -> bool:
+    # Binary headers may start with "solid" too, only ASCII files name a facet right after it
+    with open(file_path, 'rb') as f:
+        head = f.read(ASCII_PROBE_SIZE)
+    return not (head.lstrip().startswith(b'solid') and b'facet' in head)
+
+
+def _read_ascii_stl(file_path: str) -> np.ndarray:
+    with open(file_path, 'rb') as f:
+        corners = np.array(_ASCII_VERTEX.findall(f.read()), dtype=np.float32).reshape(-1, 3, 3)
+    facets = np.zeros(len(corners), dtype=STL_DTYPE)
+    facets['vectors'] = corners
+    normals = np.cross(corners[:, 1] - corners[:, 0], corners[:, 2] - corners[:, 0])
+    lengths = np.linalg.norm(normals, axis=1, keepdims=True)
+    facets['normals'] = np.divide(normals, lengths, out=np.zeros_like(normals), where=lengths > 0)
+    return facets
+
+
+def load_stl(file_path: str) -> np.ndarray:
+    """Returns the facets of an STL file as a structured array of ``STL_DTYPE``.
+
+    Binary files are memory-mapped read-only, ``['vectors']`` and
+    ``['normals']`` of the result are views into the file and pages are read
+    only when touched.
+    """
+    if not is_binary_stl(file_path):
+        return _read_ascii_stl(file_path)
+    # Padding after the facets or a wrong count in the header must not hide the facets
+    count = min(get_facet_count(file_path), (os.path.getsize(file_path) - STL_DATA_OFFSET) // STL_DTYPE.itemsize)
+    if count <= 0:
+        return np.zeros(0, dtype=STL_DTYPE)
+    return np.memmap(file_path, dtype=STL_DTYPE, mode='r', offset=STL_DATA_OFFSET, shape=(count,))
+
+
+def write_stl(file_path: str, triangles: np.ndarray) -> str:
+    normals = np.cross(triangles[:, 1] - triangles[:, 0], triangles[:, 2] - triangles[:, 0])
+    lengths = np.linalg.norm(normals, axis=1, keepdims=True)
+    np.divide(normals, lengths, out=normals, where=lengths > 0)
+
+    facets = np.zeros(len(triangles), dtype=STL_DTYPE)
+    facets['normals'] = normals
+    facets['vectors'] = triangles
+    with open(file_path, 'wb') as f:
+        f.write(b'\0' * STL_HEADER_SIZE)
+        f.write(np.uint32(len(facets)).tobytes())
+        f.write(facets.tobytes())
+    return file_path
+
+
+__all__ = [
+    'STL_DTYPE',
+    'is_binary_stl',
+    'load_stl',
+    'write_stl',
+]
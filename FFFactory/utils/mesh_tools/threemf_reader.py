@@ -0,0 +1,202 @@
+import posixpath
+import zipfile
+from typing import Optional, TypedDict
+from xml.etree import ElementTree
+
+import numpy as np
+
+from .indexed_mesh import IndexedMesh
+
+
+CORE_NAMESPACE = '{http://schemas.microsoft.com/3dmanufacturing/core/2015/02}'
+RELS_NAMESPACE = '{http://schemas.openxmlformats.org/package/2006/relationships}'
+MODEL_RELATIONSHIP_TYPE = 'http://schemas.microsoft.com/3dmanufacturing/2013/01/3dmodel'
+ROOT_RELS_PATH = '_rels/.rels'
+DEFAULT_MODEL_PATH = '3D/3dmodel.model'
+
+UNIT_TO_MM = {
+    'micron': 0.001,
+    'millimeter': 1.0,
+    'centimeter': 10.0,
+    'inch': 25.4,
+    'foot': 304.8,
+    'meter': 1000.0,
+}
+
+# Rows are collected in small Python lists and moved into the arrays in chunks
+ROWS_CHUNK_SIZE = 1 << 16
+INITIAL_CAPACITY = 1 << 12
+
+IDENTITY_TRANSFORM = np.vstack([np.identity(3), np.zeros(3)])
+
+
+class DctThreeMfObject(TypedDict):
+    object_id: str
+    name: Optional[str]
+    vertices: np.ndarray
+    faces: np.ndarray
+    components: list[tuple[str, np.ndarray]]
+
+
+class DctThreeMfPart(TypedDict):
+    object_id: str
+    name: Optional[str]
+    transform: np.ndarray
+    vertices: np.ndarray
+    faces: np.ndarray
+
+
+class GrowableArray:
+    """Array of fixed-width rows that doubles its capacity when full."""
+
+    def __init__(self, dtype: type, width: int, capacity: int = INITIAL_CAPACITY):
+        self._data = np.empty((capacity, width), dtype=dtype)
+        self._size = 0
+        self._rows: list[tuple] = []
+
+    def _flush(self) -> None:
+        if not self._rows:
+            return
+        needed = self._size + len(self._rows)
+        if needed > len(self._data):
+            capacity = len(self._data)
+            while capacity < needed:
+                capacity *= 2
+            data = np.empty((capacity, self._data.shape[1]), dtype=self._data.dtype)
+            data[:self._size] = self._data[:self._size]
+            self._data = data
+        self._data[self._size:needed] = self._rows
+        self._size = needed
+        self._rows.clear()
+
+    def append(self, row: tuple) -> None:
+        self._rows.append(row)
+        if len(self._rows) >= ROWS_CHUNK_SIZE:
+            self._flush()
+
+    def to_array(self) -> np.ndarray:
+        self._flush()
+        return self._data[:self._size].copy()
+
+
+def parse_transform(value: Optional[str]) -> np.ndarray:
+    """Parses a 3MF transform into a 4x3 matrix applied as ``vertices @ m[:3] + m[3]``."""
+    if not value:
+        return IDENTITY_TRANSFORM
+    return np.array(value.split(), dtype=np.float64).reshape(4, 3)
+
+
+def combine_transforms(inner: np.ndarray, outer: np.ndarray) -> np.ndarray:
+    return np.vstack([inner[:3] @ outer[:3], inner[3] @ outer[:3] + outer[3]])
+
+
+def get_model_path(archive: zipfile.ZipFile) -> str:
+    try:
+        rels = ElementTree.fromstring(archive.read(ROOT_RELS_PATH))
+    except KeyError:
+        return DEFAULT_MODEL_PATH
+    for relationship in rels.iter(RELS_NAMESPACE + 'Relationship'):
+        if relationship.get('Type') == MODEL_RELATIONSHIP_TYPE:
+            return posixpath.normpath(relationship.get('Target', DEFAULT_MODEL_PATH).lstrip('/'))
+    return DEFAULT_MODEL_PATH
+
+
+def read_3mf_objects(file_path: str) -> tuple[dict[str, DctThreeMfObject], list[tuple[str, np.ndarray]], float]:
+    """Streams the model part of a 3MF file.
+
+    :return: objects by id, build items as (object id, transform), millimeters per model unit
+    """
+    objects: dict[str, DctThreeMfObject] = {}
+    items: list[tuple[str, np.ndarray]] = []
+    unit_to_mm = 1.0
+    with zipfile.ZipFile(file_path) as archive, archive.open(get_model_path(archive)) as model_file:
+        current: Optional[dict] = None
+        vertices: Optional[GrowableArray] = None
+        faces: Optional[GrowableArray] = None
+        parents: list[ElementTree.Element] = []
+        for event, element in ElementTree.iterparse(model_file, events=('start', 'end')):
+            tag = element.tag
+            if event == 'start':
+                if not parents:
+                    unit_to_mm = UNIT_TO_MM.get(element.get('unit', 'millimeter'), 1.0)
+                elif tag == CORE_NAMESPACE + 'object':
+                    current = {'object_id': element.get('id'), 'name': element.get('name'), 'components': []}
+                    vertices = GrowableArray(np.float64, 3)
+                    faces = GrowableArray(np.int64, 3)
+                parents.append(element)
+                continue
+
+            parents.pop()
+            if tag == CORE_NAMESPACE + 'vertex' and vertices is not None:
+                vertices.append((
+                    float(element.get('x')), float(element.get('y')), float(element.get('z'))  # type: ignore
+                ))
+            elif tag == CORE_NAMESPACE + 'triangle' and faces is not None:
+                faces.append((int(element.get('v1')), int(element.get('v2')), int(element.get('v3'))))  # type: ignore
+            elif tag == CORE_NAMESPACE + 'component' and current is not None:
+                current['components'].append((element.get('objectid'), parse_transform(element.get('transform'))))
+            elif tag == CORE_NAMESPACE + 'item':
+                items.append((element.get('objectid'), parse_transform(element.get('transform'))))  # type: ignore
+            elif tag == CORE_NAMESPACE + 'object' and current is not None:
+                objects[current['object_id']] = DctThreeMfObject(
+                    object_id=current['object_id'],
+                    name=current['name'],
+                    vertices=vertices.to_array(),  # type: ignore
+                    faces=faces.to_array(),  # type: ignore
+                    components=current['components'],
+                )
+                current = vertices = faces = None
+            # A finished element is the last child of its parent, dropping it
+            # keeps the tree from ever holding the whole document
+            element.clear()
+            if parents:
+                del parents[-1][-1]
+    return objects, items, unit_to_mm
+
+
+def _collect_parts(
+    objects: dict[str, DctThreeMfObject],
+    object_id: str,
+    transform: np.ndarray,
+    result: list[DctThreeMfPart],
+    depth: int = 0
+) -> None:
+    if depth > len(objects):
+        raise ValueError('Cyclic components in 3mf object %s' % object_id)
+    obj = objects.get(object_id)
+    if obj is None:
+        raise ValueError('Unknown 3mf object %s' % object_id)
+    if len(obj['faces']):
+        result.append(DctThreeMfPart(
+            object_id=object_id,
+            name=obj['name'],
+            transform=transform,
+            vertices=obj['vertices'],
+            faces=obj['faces'],
+        ))
+    for component_id, component_transform in obj['components']:
+        _collect_parts(objects, component_id, combine_transforms(component_transform, transform), result, depth + 1)
+
+
+def read_3mf_parts(file_path: str) -> list[DctThreeMfPart]:
+    """Returns one part per mesh placed on the build plate, components resolved."""
+    objects, items, unit_to_mm = read_3mf_objects(file_path)
+    scale = np.diag([unit_to_mm] * 3)
+    result: list[DctThreeMfPart] = []
+    for object_id, transform in items:
+        _collect_parts(objects, object_id, combine_transforms(transform, np.vstack([scale, np.zeros(3)])), result)
+    return result
+
+
+def load_3mf_meshes(file_path: str) -> list[IndexedMesh]:
+    return [
+        IndexedMesh(part['vertices'], part['faces']).transform(part['transform'][:3], part['transform'][3])
+        for part in read_3mf_parts(file_path)
+    ]
+
+
+__all__ = [
+    'DctThreeMfPart',
+    'load_3mf_meshes',
+    'read_3mf_parts',
+]
@@ -0,0 +1,225 @@
+import csv
+import hashlib
+import json
+import queue
+import sqlite3
+import threading
+import time
+from typing import Any, Iterator, Optional
+
+from FFFactory.utils.cache_tools import file_sha256
+from FFFactory.utils.csv_tools import RowWriterBase
+
+
+DEFAULT_BATCH_SIZE = 500
+DEFAULT_FLUSH_INTERVAL_SEC = 1.0
+SCALE_PRECISION = 3
+
+SCHEMA = (
+    '''
+    CREATE TABLE IF NOT EXISTS results (
+        id INTEGER PRIMARY KEY,
+        model TEXT NOT NULL,
+        scale REAL NOT NULL,
+        config_hash TEXT NOT NULL,
+        timestamp REAL NOT NULL,
+        data TEXT NOT NULL
+    )
+    ''',
+    'CREATE INDEX IF NOT EXISTS results_model ON results (model)',
+    'CREATE INDEX IF NOT EXISTS results_scale ON results (scale)',
+    'CREATE INDEX IF NOT EXISTS results_config_hash ON results (config_hash)',
+    'CREATE INDEX IF NOT EXISTS results_timestamp ON results (timestamp)',
+)
+# Stores written before rows were unique keep only the latest row of every key
+UNIQUE_KEY = (
+    'DELETE FROM results WHERE id NOT IN (SELECT MAX(id) FROM results GROUP BY model, scale, config_hash)',
+    'CREATE UNIQUE INDEX results_key ON results (model, scale, config_hash)',
+)
+
+
+def get_scale_key(scale: Any) -> float:
+    return round(float(scale), SCALE_PRECISION)
+
+
+def get_config_hash(config_file: str, **options: bool) -> str:
+    """Hash of the slicer config and of the options changing the results, rows of another hash are not resumed.
+
+    Options left off keep the hash of the config file alone, as in stores written before them.
+    """
+    config_hash = file_sha256(config_file)
+    enabled = sorted(name for name, value in options.items() if value)
+    if not enabled:
+        return config_hash
+    return hashlib.sha256(json.dumps([config_hash, enabled]).encode()).hexdigest()
+
+
+def connect(db_file: str) -> sqlite3.Connection:
+    connection = sqlite3.connect(db_file)
+    # WAL lets readers query the store while a run is still writing to it
+    connection.execute('PRAGMA journal_mode=WAL')
+    with connection:
+        for statement in SCHEMA:
+            connection.execute(statement)
+        if connection.execute("SELECT 1 FROM sqlite_master WHERE name = 'results_key'").fetchone() is None:
+            for statement in UNIQUE_KEY:
+                connection.execute(statement)
+    return connection
+
+
+class ResultsStore:
+    """Reads the results written by ``SqliteWriter``."""
+
+    def __init__(self, db_file: str):
+        self._db_file = db_file
+
+    @property
+    def db_file(self) -> str:
+        return self._db_file
+
+    def get_done(self, config_hash: str) -> dict[str, set[float]]:
+        """Scales already stored for every model sliced with the given config."""
+        result: dict[str, set[float]] = {}
+        connection = connect(self.db_file)
+        try:
+            for model, scale in connection.execute(
+                'SELECT DISTINCT model, scale FROM results WHERE config_hash = ?', (config_hash,)
+            ):
+                result.setdefault(model, set()).add(scale)
+        finally:
+            connection.close()
+        return result
+
+    def iter_rows(self, config_hash: Optional[str] = None) -> Iterator[dict]:
+        query = 'SELECT data FROM results'
+        params: tuple = ()
+        if config_hash is not None:
+            query += ' WHERE config_hash = ?'
+            params = (config_hash,)
+        connection = connect(self.db_file)
+        try:
+            for (data,) in connection.execute(query + ' ORDER BY model, scale, timestamp', params):
+                yield json.loads(data)
+        finally:
+            connection.close()
+
+    def export_csv(self, file_name: str, fieldnames: list[str], config_hash: Optional[str] = None) -> int:
+        count = 0
+        with open(file_name, 'w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=fieldnames, extrasaction='ignore')
+            writer.writeheader()
+            for row in self.iter_rows(config_hash):
+                writer.writerow(row)
+                count += 1
+        return count
+
+    def export_jsonl(self, file_name: str, config_hash: Optional[str] = None) -> int:
+        count = 0
+        with open(file_name, 'w') as f:
+            for row in self.iter_rows(config_hash):
+                f.write(json.dumps(row) + '\n')
+                count += 1
+        return count
+
+
+class SqliteWriter(RowWriterBase):
+    """Inserts rows into the results store from a background thread.
+
+    Rows are committed in batches of ``batch_size``, or after
+    ``flush_interval_sec`` without new rows, so a crash loses at most one
+    batch.
+    """
+
+    def __init__(
+        self,
+        db_file: str,
+        config_hash: str,
+        model_field: str,
+        scale_field: str,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        flush_interval_sec: float = DEFAULT_FLUSH_INTERVAL_SEC
+    ):
+        self._db_file = db_file
+        self._config_hash = config_hash
+        self._model_field = model_field
+        self._scale_field = scale_field
+        self._batch_size = max(1, batch_size)
+        self._flush_interval_sec = flush_interval_sec
+        self._queue: queue.Queue = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._error: Optional[BaseException] = None
+
+    @property
+    def db_file(self) -> str:
+        return self._db_file
+
+    @property
+    def config_hash(self) -> str:
+        return self._config_hash
+
+    def __enter__(self) -> 'SqliteWriter':
+        # Create the schema up front so a broken path fails before any slicing
+        connect(self.db_file).close()
+        self._thread = threading.Thread(target=self._write_rows, name='SqliteWriter', daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self._queue.put(None)
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if self._error is not None and exc_type is None:
+            raise self._error
+
+    def _insert(self, connection: sqlite3.Connection, batch: list[tuple]) -> None:
+        with connection:
+            connection.executemany(
+                'INSERT INTO results (model, scale, config_hash, timestamp, data) VALUES (?, ?, ?, ?, ?) '
+                'ON CONFLICT (model, scale, config_hash) '
+                'DO UPDATE SET timestamp = excluded.timestamp, data = excluded.data',
+                batch
+            )
+        batch.clear()
+
+    def _write_rows(self) -> None:
+        connection = connect(self.db_file)
+        batch: list[tuple] = []
+        try:
+            while True:
+                try:
+                    item = self._queue.get(timeout=self._flush_interval_sec)
+                except queue.Empty:
+                    if batch:
+                        self._insert(connection, batch)
+                    continue
+                if item is None:
+                    break
+                batch.append(item)
+                if len(batch) >= self._batch_size:
+                    self._insert(connection, batch)
+            if batch:
+                self._insert(connection, batch)
+        except BaseException as e:
+            self._error = e
+        finally:
+            connection.close()
+
+    def writerow(self, data: dict) -> None:
+        if self._error is not None:
+            raise self._error
+        self._queue.put((
+            str(data[self._model_field]),
+            get_scale_key(data[self._scale_field]),
+            self.config_hash,
+            time.time(),
+            json.dumps(data, default=str),
+        ))
+
+
+__all__ = [
+    'ResultsStore',
+    'SqliteWriter',
+    'get_config_hash',
+    'get_scale_key',
+]
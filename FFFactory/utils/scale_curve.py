@@ -0,0 +1,111 @@
+from typing import Optional, Sequence
+
+import numpy as np
+
+
+# Weight follows the volume (s^3) plus the shells (s^2), print time also has
+# a per layer part growing with the height (s).
+WEIGHT_POWERS = (3, 2)
+PRINT_TIME_POWERS = (3, 2, 1)
+
+DEFAULT_ANCHORS = 3
+DEFAULT_MAX_ERROR = 0.05
+
+
+class ScaleCurve:
+    def __init__(self, powers: Sequence[int]):
+        self._powers = np.asarray(powers, dtype=np.float64)
+        self._coef: Optional[np.ndarray] = None
+        self._norm = 1.0
+
+    def _get_basis(self, scales: np.ndarray) -> np.ndarray:
+        return np.power.outer(scales / self._norm, self._powers)
+
+    def fit(self, scales: Sequence[float], values: Sequence[float]) -> 'ScaleCurve':
+        scales_arr = np.asarray(scales, dtype=np.float64)
+        values_arr = np.asarray(values, dtype=np.float64)
+        self._norm = float(scales_arr.max())
+        # Fit relative errors, otherwise the largest scale dominates the fit
+        weights = 1.0 / np.maximum(np.abs(values_arr), 1e-9)
+        basis = self._get_basis(scales_arr) * weights[:, None]
+        self._coef = np.linalg.lstsq(basis, values_arr * weights, rcond=None)[0]
+        return self
+
+    def predict(self, scales: Sequence[float]) -> np.ndarray:
+        if self._coef is None:
+            raise ValueError('Scale curve is not fitted.')
+        result = self._get_basis(np.asarray(scales, dtype=np.float64)) @ self._coef
+        return np.maximum(result, 0.0)
+
+
+class ScaleCurveEstimator:
+    """Slices a few anchor scales of a model and fills in the others from fitted curves."""
+
+    def __init__(
+        self,
+        anchors: int = DEFAULT_ANCHORS,
+        verify: bool = True,
+        max_error: float = DEFAULT_MAX_ERROR
+    ):
+        if anchors < len(PRINT_TIME_POWERS):
+            raise ValueError('At least %s anchors are needed.' % len(PRINT_TIME_POWERS))
+        self._anchors = anchors
+        self._verify = verify
+        self._max_error = max_error
+
+    @property
+    def anchors(self) -> int:
+        return self._anchors
+
+    @property
+    def verify(self) -> bool:
+        return self._verify
+
+    @property
+    def max_error(self) -> float:
+        return self._max_error
+
+    def can_estimate(self, n_sizes: int) -> bool:
+        return n_sizes > self.anchors + int(self.verify)
+
+    def get_anchor_indexes(self, n_sizes: int) -> list[int]:
+        return sorted(set(np.linspace(0, n_sizes - 1, self.anchors).round().astype(int).tolist()))
+
+    def get_verify_index(self, n_sizes: int, anchor_indexes: Sequence[int]) -> Optional[int]:
+        if not self.verify:
+            return None
+        # The middle of the widest gap is where the curves are least constrained
+        gaps = np.diff(anchor_indexes)
+        widest = int(np.argmax(gaps))
+        if gaps[widest] < 2:
+            return None
+        return int(anchor_indexes[widest] + gaps[widest] // 2)
+
+    def estimate(
+        self,
+        anchor_scales: Sequence[float],
+        anchor_print_times: Sequence[float],
+        anchor_weights: Sequence[float],
+        scales: Sequence[float]
+    ) -> tuple[np.ndarray, np.ndarray]:
+        print_times = ScaleCurve(PRINT_TIME_POWERS).fit(anchor_scales, anchor_print_times).predict(scales)
+        weights = ScaleCurve(WEIGHT_POWERS).fit(anchor_scales, anchor_weights).predict(scales)
+        return print_times, weights
+
+    @staticmethod
+    def get_error(
+        print_time: float,
+        weight: float,
+        estimated_print_time: float,
+        estimated_weight: float
+    ) -> float:
+        return max(
+            abs(estimated_print_time - print_time) / max(print_time, 1e-9),
+            abs(estimated_weight - weight) / max(weight, 1e-9),
+        )
+
+
+__all__ = [
+    'ScaleCurve',
+    'ScaleCurveEstimator',
+]
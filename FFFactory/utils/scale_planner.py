@@ -0,0 +1,152 @@
+from decimal import Decimal
+from typing import Optional, Sequence, TypedDict
+
+import numpy as np
+
+from FFFactory.utils.auto_slicer.consts.slicer_const import MAX_SIZE_X_Y, MAX_SIZE_Z
+from FFFactory.utils.mesh_tools.mesh_cut import get_cut_counts
+
+
+DEFAULT_ANGLE_STEP = 5
+# Points times angles projected at once
+CHUNK_CELLS = 1 << 22
+
+
+class DctPlannedSize(TypedDict):
+    size_x: Decimal
+    size_y: Decimal
+    size_z: Decimal
+    # Degrees around Z, counterclockwise, applied before scaling
+    rotation: Decimal
+    fits: bool
+    # Parts along X, Y and Z the model is cut into to fit, all 1 when it fits whole
+    cuts: tuple[int, int, int]
+    parts: int
+
+
+def get_footprints(points_xy: np.ndarray, angles: np.ndarray) -> np.ndarray:
+    """Widths along X and Y of the points rotated by every angle in degrees.
+
+    :return: array of shape (angles, 2)
+    """
+    radians = np.radians(np.asarray(angles, dtype=np.float64))
+    # Rows of x and y after the rotation, for every angle
+    directions = np.concatenate([
+        np.stack([np.cos(radians), -np.sin(radians)], axis=1),
+        np.stack([np.sin(radians), np.cos(radians)], axis=1),
+    ])
+    points = np.asarray(points_xy, dtype=np.float64).reshape(-1, 2)
+    low = np.full(len(directions), np.inf)
+    high = np.full(len(directions), -np.inf)
+    step = max(1, CHUNK_CELLS // len(directions))
+    for start in range(0, len(points), step):
+        projected = points[start:start + step] @ directions.T
+        low = np.minimum(low, projected.min(axis=0))
+        high = np.maximum(high, projected.max(axis=0))
+    return (high - low).reshape(2, -1).T
+
+
+class ScalePlanner:
+    """Plans the scaled sizes of a model against the bed before anything is sliced.
+
+    All sizes come from one bounding box in one pass, sizes over the bed
+    are kept with ``fits`` False. With ``rotate`` a size over the bed is
+    tried turned around Z every ``angle_step`` degrees. With ``cut`` a size
+    still over the bed or taller than ``max_size_z`` is cut into parts that fit.
+    """
+
+    def __init__(
+        self,
+        max_size_x_y: Sequence[float] = MAX_SIZE_X_Y,
+        rotate: bool = False,
+        angle_step: int = DEFAULT_ANGLE_STEP,
+        max_size_z: float = MAX_SIZE_Z,
+        cut: bool = False
+    ):
+        if not 0 < angle_step <= 90:
+            raise ValueError('Angle step must be in (0, 90], got %s' % angle_step)
+        self._max_size_x_y = tuple(max_size_x_y)
+        self._rotate = rotate
+        self._angle_step = angle_step
+        self._max_size_z = max_size_z
+        self._cut = cut
+
+    @property
+    def max_size_x_y(self) -> tuple[float, ...]:
+        return self._max_size_x_y
+
+    @property
+    def max_size_z(self) -> float:
+        return self._max_size_z
+
+    @property
+    def max_size_xyz(self) -> tuple[float, ...]:
+        return (*self.max_size_x_y, self.max_size_z)
+
+    @property
+    def cut(self) -> bool:
+        return self._cut
+
+    @property
+    def rotate(self) -> bool:
+        return self._rotate
+
+    @property
+    def angle_step(self) -> int:
+        return self._angle_step
+
+    def plan(
+        self,
+        size_xyz: Sequence[float],
+        heights: Sequence[float],
+        points_xy: Optional[np.ndarray] = None
+    ) -> list[DctPlannedSize]:
+        """Sizes of the model scaled to every height in mm.
+
+        :param points_xy: vertices of the model, needed to turn it, the bounding box of a turned box only grows
+        """
+        size = np.asarray(size_xyz, dtype=np.float64)
+        factors = np.asarray(heights, dtype=np.float64) / size[2]
+        bed = np.asarray(self.max_size_x_y, dtype=np.float64)
+        footprints = factors[:, None] * size[None, :2]
+        rotations = np.zeros(len(factors))
+        cuts = np.ones((len(factors), 3), dtype=int)
+        # The height is checked only when cutting, the slicer config may allow a taller print
+        low_enough = factors * size[2] <= self.max_size_z if self.cut else np.ones(len(factors), dtype=bool)
+        fits = (footprints <= bed).all(axis=1) & low_enough
+
+        if self.rotate and points_xy is not None and not fits.all():
+            angles = np.arange(self.angle_step, 180, self.angle_step, dtype=np.float64)
+            widths = get_footprints(points_xy, angles)
+            # Largest factor every angle allows, the best angle allows the largest one
+            limits = (bed[None, :] / np.maximum(widths, 1e-12)).min(axis=1)
+            best = int(np.argmax(limits))
+            turned = ~fits & low_enough & (factors <= limits[best])
+            footprints[turned] = factors[turned, None] * widths[best]
+            rotations[turned] = angles[best]
+            fits |= turned
+
+        if self.cut:
+            # Only sizes still over the printer when turned are cut, parts are cut from the model as it is
+            cuts[~fits] = get_cut_counts(factors[~fits, None] * size, self.max_size_xyz)
+            fits[:] = True
+
+        return [
+            DctPlannedSize(
+                size_x=Decimal(footprint[0]),
+                size_y=Decimal(footprint[1]),
+                size_z=Decimal(size[2] * factor),
+                rotation=Decimal(int(rotation)),
+                fits=bool(fit),
+                cuts=tuple(int(count) for count in counts),  # type: ignore
+                parts=int(counts.prod()),
+            )
+            for footprint, factor, rotation, fit, counts in zip(footprints, factors, rotations, fits, cuts)
+        ]
+
+
+__all__ = [
+    'DctPlannedSize',
+    'ScalePlanner',
+    'get_footprints',
+]
@@ -7,6 +7,10 @@ def remove_file(file_path: str):
         os.remove(file_path)
 
 
+def get_threads_per_job(jobs: int) -> int:
+    return max(1, (os.cpu_count() or 1) // max(1, jobs))
+
+
 class ExistsPathType(BasicType):
     def __init__(self, value: str):
         super().__init__(value)